@@ -1,18 +1,52 @@
 """Azure CLI credential authentication for az-pim-cli."""
 
 import base64
-import json
 import os
 import socket
+import threading
+import time
 from collections.abc import Generator
 from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
 from typing import Any
 
 from azure.identity import AzureCliCredential, DefaultAzureCredential
 
+from az_pim_cli.jsonutil import loads_json
+
 # Store original getaddrinfo for selective IPv4 forcing
 _original_getaddrinfo = socket.getaddrinfo
 
+# Whether DNS resolution in the current context is restricted to IPv4
+_ipv4_only: ContextVar[bool] = ContextVar("az_pim_ipv4_only", default=False)
+
+# Accepted (lowercased) values for enabling boolean environment switches
+_TRUTHY_ENV_VALUES = frozenset({"1", "true", "yes"})
+
+# Refresh cached tokens this many seconds before they expire, leaving room for
+# a long paginated listing or activation to finish on the same token
+TOKEN_REFRESH_SKEW_SECONDS = 300
+
+
+def _getaddrinfo_router(
+    host: str, port: int | str, family: int = 0, type: int = 0, proto: int = 0, flags: int = 0
+) -> Any:
+    """Resolve normally, or IPv4-only inside ipv4_only_context()."""
+    if not _ipv4_only.get():
+        return _original_getaddrinfo(host, port, family, type, proto, flags)
+
+    # IPv4 literals need no lookup; answer directly instead of calling libc
+    try:
+        socket.inet_pton(socket.AF_INET, host)
+        sockaddr = (host, int(port or 0))
+    except (OSError, TypeError, ValueError):
+        return _original_getaddrinfo(host, port, socket.AF_INET, type, proto, flags)
+    return [(socket.AF_INET, type or socket.SOCK_STREAM, proto, "", sockaddr)]
+
+
+socket.getaddrinfo = _getaddrinfo_router  # type: ignore[assignment]
+
 
 @contextmanager
 def ipv4_only_context() -> Generator[None, None, None]:
@@ -20,24 +54,20 @@ def ipv4_only_context() -> Generator[None, None, None]:
     Context manager that temporarily forces IPv4-only DNS resolution.
     This works around DNS resolution issues with IPv6 on some networks.
 
+    socket.getaddrinfo is replaced once at import by a router that checks a
+    context variable, so the setting is scoped to the current thread or task
+    and never leaks into concurrent callers.
+
     Usage:
         with ipv4_only_context():
             # Network calls here will use IPv4 only
             response = requests.get(url)
     """
-
-    def _ipv4_only_getaddrinfo(
-        host: str, port: int | str, family: int = 0, type: int = 0, proto: int = 0, flags: int = 0
-    ) -> Any:
-        """Force IPv4 resolution to avoid IPv6 DNS issues"""
-        return _original_getaddrinfo(host, port, socket.AF_INET, type, proto, flags)
-
-    original = socket.getaddrinfo
-    socket.getaddrinfo = _ipv4_only_getaddrinfo  # type: ignore[assignment]
+    token = _ipv4_only.set(True)
     try:
         yield
     finally:
-        socket.getaddrinfo = original
+        _ipv4_only.reset(token)
 
 
 def should_use_ipv4_only() -> bool:
@@ -48,7 +78,36 @@ def should_use_ipv4_only() -> bool:
     Returns:
         True if IPv4-only mode is enabled
     """
-    return os.environ.get("AZ_PIM_IPV4_ONLY", "").strip().lower() in ("1", "true", "yes")
+    return os.environ.get("AZ_PIM_IPV4_ONLY", "").strip().lower() in _TRUTHY_ENV_VALUES
+
+
+@lru_cache(maxsize=16)
+def _decode_jwt_claims(token: str) -> dict[str, Any]:
+    """
+    Decode the payload of a JWT access token without verifying its signature.
+
+    Results are cached per token string, so reading several claims (oid, tid,
+    exp) from the same token decodes it once. Callers must not mutate the
+    returned dict.
+
+    Args:
+        token: Access token
+
+    Returns:
+        Token claims, or an empty dict if the token is not a decodable JWT
+    """
+    try:
+        # header.payload.signature; partition avoids building the split list
+        payload_part = token.partition(".")[2].partition(".")[0]
+
+        # Add padding if needed (JWT base64 may not be padded)
+        payload_part += "=" * (-len(payload_part) & 3)
+
+        # Decode payload without signature verification (already verified by Azure SDK)
+        claims = loads_json(base64.urlsafe_b64decode(payload_part))
+    except Exception:
+        return {}
+    return claims if isinstance(claims, dict) else {}
 
 
 class AzureAuth:
@@ -58,13 +117,21 @@ class AzureAuth:
         """Initialize Azure authentication."""
         self._credential: AzureCliCredential | None = None
         self._default_credential: DefaultAzureCredential | None = None
-        self._token_cache: dict[str, dict] = {}
+        # Credential that passed the probe, reused until it fails to issue a token
+        self._active_credential: AzureCliCredential | DefaultAzureCredential | None = None
+        # scope -> (access token, expires_on epoch seconds)
+        self._token_cache: dict[str, tuple[str, float]] = {}
+        self._token_lock = threading.Lock()
+        # Signed-in user's object ID, resolved once per AzureAuth instance
+        self._user_object_id: str | None = None
 
     def _get_credential(self) -> AzureCliCredential | DefaultAzureCredential:
         """
         Get the appropriate credential for authentication.
         Tries AzureCliCredential first (uses cached Azure CLI login),
         then falls back to DefaultAzureCredential.
+        The credential that succeeds is remembered, so the probe runs once
+        rather than before every token request.
 
         Returns:
             Azure credential instance
@@ -74,6 +141,9 @@ class AzureAuth:
         """
         from az_pim_cli.exceptions import AuthenticationError
 
+        if self._active_credential is not None:
+            return self._active_credential
+
         if self._credential is None:
             try:
                 self._credential = AzureCliCredential()
@@ -84,6 +154,7 @@ class AzureAuth:
             try:
                 # Test the credential
                 self._credential.get_token("https://management.azure.com/.default")
+                self._active_credential = self._credential
                 return self._credential
             except Exception:
                 self._credential = None
@@ -95,6 +166,7 @@ class AzureAuth:
         try:
             # Test the credential
             self._default_credential.get_token("https://management.azure.com/.default")
+            self._active_credential = self._default_credential
             return self._default_credential
         except Exception as e:
             raise AuthenticationError(
@@ -121,28 +193,62 @@ class AzureAuth:
         """
         from az_pim_cli.exceptions import AuthenticationError
 
-        try:
-            credential = self._get_credential()
+        # Serialize acquisition so concurrent page/scope fetches share one token
+        # instead of each spawning its own credential call.
+        with self._token_lock:
+            cached = self._token_cache.get(scope)
+            if cached is not None and cached[1] - time.time() > TOKEN_REFRESH_SKEW_SECONDS:
+                return cached[0]
+
+            try:
+                credential = self._get_credential()
 
-            if should_use_ipv4_only():
-                with ipv4_only_context():
+                if should_use_ipv4_only():
+                    with ipv4_only_context():
+                        token = credential.get_token(scope)
+                else:
                     token = credential.get_token(scope)
-            else:
-                token = credential.get_token(scope)
+            except Exception as e:
+                # Probe the credential chain again next time (e.g. after 'az login')
+                self._active_credential = None
+                raise AuthenticationError(
+                    "Failed to get access token",
+                    suggestion=(
+                        "Run 'az login' to authenticate, or verify your credentials are configured"
+                    ),
+                ) from e
+
+            expires_on = getattr(token, "expires_on", None)
+            if not isinstance(expires_on, int | float) and isinstance(token.token, str):
+                # Credentials that don't report an expiry still issue JWTs with an exp claim
+                expires_on = _decode_jwt_claims(token.token).get("exp")
+            if isinstance(expires_on, int | float):
+                self._token_cache[scope] = (token.token, float(expires_on))
+
+            return str(token.token)
+
+    def invalidate_token(self, scope: str | None = None) -> None:
+        """
+        Drop cached access tokens so the next get_token() fetches a fresh one.
 
-            return token.token
-        except Exception as e:
-            raise AuthenticationError(
-                "Failed to get access token",
-                suggestion=(
-                    "Run 'az login' to authenticate, or verify your credentials are configured"
-                ),
-            ) from e
+        Args:
+            scope: Scope to invalidate, or None to invalidate all scopes (this
+                also forgets the cached user object ID)
+        """
+        with self._token_lock:
+            if scope is None:
+                self._token_cache.clear()
+                self._user_object_id = None
+            else:
+                self._token_cache.pop(scope, None)
 
     def get_user_object_id(self) -> str:
         """
         Get the object ID of the currently authenticated user.
 
+        The ID is cached after the first successful lookup, since callers ask
+        for it on nearly every list and activation request.
+
         Returns:
             User object ID (principal ID)
 
@@ -151,9 +257,13 @@ class AzureAuth:
         """
         from az_pim_cli.exceptions import AuthenticationError
 
+        if self._user_object_id is not None:
+            return self._user_object_id
+
         try:
             oid = self._extract_token_claim("https://graph.microsoft.com/.default", "oid")
             if oid:
+                self._user_object_id = oid
                 return oid
             raise ValueError("oid claim not found in token")
         except Exception as e:
@@ -198,22 +308,12 @@ class AzureAuth:
         """
         try:
             token = self.get_token(scope)
-            payload_part = token.split(".")[1]
-
-            # Add padding if needed (JWT base64 may not be padded)
-            padding = len(payload_part) % 4
-            if padding:
-                payload_part += "=" * (4 - padding)
-
-            # Decode payload without signature verification (already verified by Azure SDK)
-            decoded = base64.urlsafe_b64decode(payload_part)
-            claims = json.loads(decoded)
-
-            claim_value = claims.get(claim)
-            return str(claim_value) if claim_value is not None else None
         except Exception:
             return None
 
+        claim_value = _decode_jwt_claims(token).get(claim)
+        return str(claim_value) if claim_value is not None else None
+
     def get_subscription_id(self) -> str:
         """
         Get the current subscription ID.
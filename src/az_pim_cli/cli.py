@@ -5,7 +5,7 @@ import sys
 from typing import Any
 
 import typer
-from rich.console import Console
+from rich.console import Console, Group, RenderableType
 from rich.table import Table
 
 from az_pim_cli.auth import AzureAuth, should_use_ipv4_only
@@ -37,6 +37,20 @@ app = typer.Typer(
 console = Console()
 
 
+def _is_tty() -> bool:
+    """
+    Check whether stdin is an interactive terminal.
+
+    Returns:
+        True if prompts can be shown, False otherwise (including when stdin
+        is closed or replaced by an object without isatty)
+    """
+    try:
+        return sys.stdin.isatty()
+    except Exception:
+        return False
+
+
 def get_resolver(config: Config, is_tty: bool | None = None) -> InputResolver:
     """
     Get a configured InputResolver instance.
@@ -278,9 +292,12 @@ def list_roles(
             f"[dim]Found {len(alias_roles)} alias(es) and {len(azure_roles)} Azure role(s)[/dim]\n"
         )
 
+        # Collect headings and tables, then write them in a single print
+        renderables: list[RenderableType] = []
+
         # Display aliases in a separate table first
         if alias_roles:
-            console.print("[bold green]Configured Aliases[/bold green]")
+            renderables.append("[bold green]Configured Aliases[/bold green]")
             alias_table = Table(show_header=True, header_style="bold magenta")
             alias_table.add_column("#", style="bold white", justify="right", width=4)
             alias_table.add_column("Alias", style="cyan")
@@ -314,13 +331,12 @@ def list_roles(
                     scope_display,
                 )
 
-            console.print(alias_table)
-            console.print()
+            renderables.extend((alias_table, ""))
 
         # Display Azure roles in a separate table
         if azure_roles:
             role_type = "Resource Roles" if resource else "Azure AD Roles"
-            console.print(f"[bold green]Eligible {role_type}[/bold green]")
+            renderables.append(f"[bold green]Eligible {role_type}[/bold green]")
 
             roles_table = Table(show_header=True, header_style="bold magenta")
             roles_table.add_column("#", style="bold white", justify="right", width=4)
@@ -351,7 +367,9 @@ def list_roles(
                     end_time_display,
                 )
 
-            console.print(roles_table)
+            renderables.append(roles_table)
+
+        console.print(Group(*renderables))
 
         # Interactive selection mode
         if select:
@@ -465,25 +483,26 @@ def list_roles(
         raise typer.Exit(1)
 
 
-@app.command("activate")
-def activate_role(
-    role: str | None = typer.Argument(
-        None,
-        help="Role name, ID, alias, or #N (number from list) to activate. If omitted in a TTY, you'll be prompted to search and pick.",
-    ),
-    duration: float | None = typer.Option(None, "--duration", "-d", help="Duration in hours"),
-    justification: str | None = typer.Option(
-        None, "--justification", "-j", help="Justification for activation"
-    ),
-    resource: bool = typer.Option(
-        False, "--resource", "-r", help="Activate resource role instead of directory role"
-    ),
-    scope: str | None = typer.Option(None, "--scope", "-s", help="Scope for resource roles"),
-    ticket: str | None = typer.Option(None, "--ticket", "-t", help="Ticket number"),
-    ticket_system: str | None = typer.Option(None, "--ticket-system", help="Ticket system name"),
-    verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output"),
+def _activate_impl(
+    role: str | None,
+    *,
+    duration: float | None = None,
+    justification: str | None = None,
+    resource: bool = False,
+    scope: str | None = None,
+    ticket: str | None = None,
+    ticket_system: str | None = None,
+    verbose: bool = False,
 ) -> None:
-    """Activate a role."""
+    """
+    Activate a role; the implementation behind the activate command.
+
+    Takes plain keyword arguments so it can be called without Typer parsing.
+    See activate_role for the meaning of each argument.
+
+    Raises:
+        typer.Exit: With code 1 if activation fails
+    """
     try:
         from az_pim_cli.models import alias_to_normalized_role
 
@@ -494,12 +513,6 @@ def activate_role(
         role_id: str | None = None
         role_input: str | None = role
 
-        def is_interactive() -> bool:
-            try:
-                return sys.stdin.isatty()
-            except Exception:
-                return False
-
         def ensure_scope(current_scope: str | None) -> str:
             """Ensure a valid scope is provided, prompting if necessary."""
             if current_scope:
@@ -509,7 +522,7 @@ def activate_role(
 
             default_sub = auth.get_subscription_id()
             default_scope = f"subscriptions/{default_sub}"
-            if is_interactive():
+            if _is_tty():
                 result = typer.prompt("Enter scope", default=default_scope)
                 return str(result) if result else default_scope
             return default_scope
@@ -518,7 +531,7 @@ def activate_role(
             if (ticket and ticket_system) or (not ticket and not ticket_system):
                 return ticket, ticket_system
 
-            if not is_interactive():
+            if not _is_tty():
                 # Non-interactive: don't surprise with prompts; ignore incomplete ticket info.
                 return None, None
 
@@ -548,8 +561,10 @@ def activate_role(
             azure_roles: list[NormalizedRole],
             show_full_scope: bool = False,
         ) -> None:
+            renderables: list[RenderableType] = []
+
             if alias_roles:
-                console.print("[bold green]Configured Aliases[/bold green]")
+                renderables.append("[bold green]Configured Aliases[/bold green]")
                 alias_table = Table(show_header=True, header_style="bold magenta")
                 alias_table.add_column("#", style="bold white", justify="right", width=4)
                 alias_table.add_column("Alias", style="cyan")
@@ -578,12 +593,11 @@ def activate_role(
                         scope_display,
                     )
 
-                console.print(alias_table)
-                console.print()
+                renderables.extend((alias_table, ""))
 
             if azure_roles:
                 role_type = "Resource Roles" if resource else "Azure AD Roles"
-                console.print(f"[bold green]Eligible {role_type}[/bold green]")
+                renderables.append(f"[bold green]Eligible {role_type}[/bold green]")
 
                 roles_table = Table(show_header=True, header_style="bold magenta")
                 roles_table.add_column("#", style="bold white", justify="right", width=4)
@@ -613,11 +627,13 @@ def activate_role(
                         end_time_display,
                     )
 
-                console.print(roles_table)
+                renderables.append(roles_table)
+
+            console.print(Group(*renderables))
 
         # If no role was provided, run interactive picker (TTY only)
         if role_input is None:
-            if not is_interactive():
+            if not _is_tty():
                 console.print("[red]Role name or ID is required in non-interactive mode.[/red]")
                 raise typer.Exit(1)
 
@@ -899,7 +915,7 @@ def activate_role(
             role_id = alias.get("role")
             if not role_id:
                 console.print("[yellow]Alias is missing 'role' field.[/yellow]")
-                if is_interactive():
+                if _is_tty():
                     role_id = typer.prompt("Enter role name or ID")
                 else:
                     console.print(
@@ -919,7 +935,7 @@ def activate_role(
                     subscription = alias.get("subscription")
                     if not subscription:
                         # Prompt for subscription if missing (TTY) or use current subscription (non-TTY)
-                        if is_interactive():
+                        if _is_tty():
                             subscription = typer.prompt(
                                 "Enter subscription ID", default=auth.get_subscription_id()
                             )
@@ -937,7 +953,7 @@ def activate_role(
                     "[yellow]Resource scope is required for resource role activation.[/yellow]"
                 )
                 default_sub = auth.get_subscription_id()
-                if is_interactive():
+                if _is_tty():
                     scope = typer.prompt("Enter scope", default=f"subscriptions/{default_sub}")
                 else:
                     scope = f"subscriptions/{default_sub}"
@@ -980,7 +996,7 @@ def activate_role(
                 role_id = resolved_role.id
 
         # Prompt for missing required inputs with defaults implied by TTY
-        if is_interactive() and duration is None:
+        if _is_tty() and duration is None:
             # Suggest default duration from config (e.g., PT8H) or fallback to 8 hours
             default_dur = parse_duration_from_alias(config.get_default("duration")) or 8.0
             dur_input = typer.prompt("Enter duration (hours)", default=str(int(default_dur)))
@@ -992,7 +1008,7 @@ def activate_role(
                 )
                 raise typer.Exit(1)
 
-        if is_interactive() and not justification:
+        if _is_tty() and not justification:
             default_just = config.get_default("justification") or "Requested via az-pim-cli"
             justification = typer.prompt("Enter justification", default=default_just)
 
@@ -1066,6 +1082,37 @@ def activate_role(
         raise typer.Exit(1)
 
 
+@app.command("activate")
+def activate_role(
+    role: str | None = typer.Argument(
+        None,
+        help="Role name, ID, alias, or #N (number from list) to activate. If omitted in a TTY, you'll be prompted to search and pick.",
+    ),
+    duration: float | None = typer.Option(None, "--duration", "-d", help="Duration in hours"),
+    justification: str | None = typer.Option(
+        None, "--justification", "-j", help="Justification for activation"
+    ),
+    resource: bool = typer.Option(
+        False, "--resource", "-r", help="Activate resource role instead of directory role"
+    ),
+    scope: str | None = typer.Option(None, "--scope", "-s", help="Scope for resource roles"),
+    ticket: str | None = typer.Option(None, "--ticket", "-t", help="Ticket number"),
+    ticket_system: str | None = typer.Option(None, "--ticket-system", help="Ticket system name"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Enable verbose output"),
+) -> None:
+    """Activate a role."""
+    _activate_impl(
+        role,
+        duration=duration,
+        justification=justification,
+        resource=resource,
+        scope=scope,
+        ticket=ticket,
+        ticket_system=ticket_system,
+        verbose=verbose,
+    )
+
+
 @app.command("history")
 def view_history(
     days: int = typer.Option(30, "--days", "-d", help="Number of days to look back"),
@@ -1,5 +1,10 @@
 """Custom exceptions for Azure PIM CLI."""
 
+# Lowercased fragments of connection errors caused by DNS resolution failures
+# ("name resolution" also covers glibc's "Temporary failure in name resolution").
+# API clients match these to decide whether a NetworkError should suggest IPv4-only mode.
+DNS_ERROR_MARKERS = ("getaddrinfo failed", "name resolution", "name or service not known")
+
 
 class PIMError(Exception):
     """Base exception for PIM CLI errors."""
@@ -109,15 +109,22 @@ def normalize_arm_role(arm_response: dict[str, Any]) -> NormalizedRole:
         }
     }
     """
-    props = arm_response.get("properties", {})
-    expanded = props.get("expandedProperties", {})
-    role_def = expanded.get("roleDefinition", {})
-    scope_info = expanded.get("scope", {})
+    # Fast path: ARM list responses almost always carry the full expanded structure,
+    # so index directly and only fall back to the defaulting .get() chain on a miss.
+    try:
+        props = arm_response["properties"]
+        expanded = props["expandedProperties"]
+        scope_info = expanded["scope"]
+        name = expanded["roleDefinition"]["displayName"]
+    except KeyError:
+        props = arm_response.get("properties", {})
+        expanded = props.get("expandedProperties", {})
+        scope_info = expanded.get("scope", {})
+        name = expanded.get("roleDefinition", {}).get("displayName", "Unknown")
 
-    name = role_def.get("displayName", "Unknown")
     role_id = props.get("roleDefinitionId", "")
     status = props.get("status", "Active")
-    scope = props.get("scope", scope_info.get("id", ""))
+    scope = props["scope"] if "scope" in props else scope_info.get("id", "")
 
     # Extract portal-equivalent fields
     resource_name = scope_info.get("displayName")
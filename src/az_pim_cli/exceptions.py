@@ -7,6 +7,7 @@ DEPRECATION NOTICE:
 
 # Import from domain layer for backward compatibility
 from az_pim_cli.domain.exceptions import (  # noqa: F401
+    DNS_ERROR_MARKERS,
     AuthenticationError,
     NetworkError,
     ParsingError,
@@ -20,4 +21,5 @@ __all__ = [
     "PermissionError",
     "AuthenticationError",
     "ParsingError",
+    "DNS_ERROR_MARKERS",
 ]
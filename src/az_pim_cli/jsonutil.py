@@ -0,0 +1,36 @@
+"""JSON decoding for Azure API responses.
+
+List pages from ARM and Microsoft Graph can run to hundreds of KB on large
+tenants, which makes JSON decoding the main CPU cost after network I/O. When the
+optional orjson package is installed it is used to decode response bytes
+directly; otherwise the stdlib json module is used.
+"""
+
+import json
+from typing import Any
+
+# Optional fast JSON decoding with orjson
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def loads_json(content: bytes) -> Any:
+    """
+    Decode a JSON document from raw response bytes.
+
+    Args:
+        content: Response body (e.g. requests.Response.content)
+
+    Returns:
+        Decoded JSON value
+
+    Raises:
+        ValueError: If the content is not valid JSON
+    """
+    if HAS_ORJSON:
+        return orjson.loads(content)
+    return json.loads(content)
@@ -8,6 +8,8 @@ Reference:
 - https://rich.readthedocs.io/en/stable/introduction.html
 """
 
+from typing import Any
+
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
@@ -15,6 +17,51 @@ from rich.table import Table
 console = Console()
 
 
+# Column specs (header, add_column kwargs), built once at import and reused
+# for every table so repeated renders only pay for Table construction.
+_ColumnSpec = tuple[str, dict[str, Any]]
+
+_INDEX_COLUMN: _ColumnSpec = ("#", {"style": "dim", "width": 4})
+_ROLE_NAME_COLUMN: _ColumnSpec = ("Role Name", {"style": "green"})
+_ROLE_STATUS_COLUMN: _ColumnSpec = ("Status", {"style": "yellow"})
+_ROLE_SCOPE_COLUMN: _ColumnSpec = ("Scope", {"style": "blue"})
+_ROLE_ID_COLUMN: _ColumnSpec = ("Role ID", {"style": "dim", "overflow": "fold"})
+
+_HISTORY_COLUMNS: tuple[_ColumnSpec, ...] = (
+    ("Date", {"style": "cyan"}),
+    ("Role", {"style": "green"}),
+    ("Status", {"style": "yellow"}),
+    ("Duration", {"style": "blue"}),
+    ("Justification", {"overflow": "fold"}),
+)
+
+_APPROVALS_COLUMNS: tuple[_ColumnSpec, ...] = (
+    _INDEX_COLUMN,
+    ("Requestor", {"style": "green"}),
+    ("Role", {"style": "cyan"}),
+    ("Requested", {"style": "blue"}),
+    ("Justification", {"overflow": "fold"}),
+    ("Request ID", {"style": "dim", "overflow": "fold"}),
+)
+
+
+def _build_table(title: str, columns: tuple[_ColumnSpec, ...]) -> Table:
+    """
+    Create a Rich table with the standard header style and the given columns.
+
+    Args:
+        title: Table title
+        columns: Column specs as (header, add_column kwargs) pairs
+
+    Returns:
+        Configured Rich Table
+    """
+    table = Table(title=title, show_header=True, header_style="bold cyan")
+    for header, options in columns:
+        table.add_column(header, **options)
+    return table
+
+
 def create_roles_table(
     title: str = "Roles",
     show_scope: bool = False,
@@ -33,20 +80,17 @@ def create_roles_table(
     Returns:
         Configured Rich Table
     """
-    table = Table(title=title, show_header=True, header_style="bold cyan")
-
-    table.add_column("#", style="dim", width=4)
-    table.add_column("Role Name", style="green")
+    columns = [_INDEX_COLUMN, _ROLE_NAME_COLUMN]
 
     if show_status:
-        table.add_column("Status", style="yellow")
+        columns.append(_ROLE_STATUS_COLUMN)
 
     if show_scope:
-        table.add_column("Scope", style="blue")
+        columns.append(_ROLE_SCOPE_COLUMN)
 
-    table.add_column("Role ID", style="dim", overflow="fold")
+    columns.append(_ROLE_ID_COLUMN)
 
-    return table
+    return _build_table(title, tuple(columns))
 
 
 def create_history_table(title: str = "Activation History") -> Table:
@@ -59,15 +103,7 @@ def create_history_table(title: str = "Activation History") -> Table:
     Returns:
         Configured Rich Table
     """
-    table = Table(title=title, show_header=True, header_style="bold cyan")
-
-    table.add_column("Date", style="cyan")
-    table.add_column("Role", style="green")
-    table.add_column("Status", style="yellow")
-    table.add_column("Duration", style="blue")
-    table.add_column("Justification", overflow="fold")
-
-    return table
+    return _build_table(title, _HISTORY_COLUMNS)
 
 
 def create_approvals_table(title: str = "Pending Approvals") -> Table:
@@ -80,16 +116,7 @@ def create_approvals_table(title: str = "Pending Approvals") -> Table:
     Returns:
         Configured Rich Table
     """
-    table = Table(title=title, show_header=True, header_style="bold cyan")
-
-    table.add_column("#", style="dim", width=4)
-    table.add_column("Requestor", style="green")
-    table.add_column("Role", style="cyan")
-    table.add_column("Requested", style="blue")
-    table.add_column("Justification", overflow="fold")
-    table.add_column("Request ID", style="dim", overflow="fold")
-
-    return table
+    return _build_table(title, _APPROVALS_COLUMNS)
 
 
 def print_success(message: str) -> None:
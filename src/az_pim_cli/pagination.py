@@ -0,0 +1,99 @@
+"""nextLink pagination shared by the Azure API clients.
+
+ARM list APIs link to the following page with "nextLink" and Microsoft Graph with
+"@odata.nextLink". Both embed the full query string in the link, so only the first
+page is requested with explicit query parameters. While the current page is being
+consumed the next one can already be requested on an executor, which overlaps
+JSON decoding and rendering with the network latency of the next page.
+"""
+
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, Future
+from typing import Any
+
+from az_pim_cli.exceptions import ParsingError
+
+# Keys under which ARM and Microsoft Graph return the URL of the next page
+NEXT_LINK_KEYS = ("@odata.nextLink", "nextLink")
+
+# fetch(url, params) -> decoded JSON page; params is None for nextLink URLs
+PageFetcher = Callable[[str, dict[str, Any] | None], dict[str, Any]]
+
+
+def paginate(
+    fetch: PageFetcher,
+    url: str,
+    params: dict[str, Any] | None,
+    *,
+    operation: str,
+    allowed_prefixes: str | tuple[str, ...],
+    limit: int | None = None,
+    executor: Executor | None = None,
+    verbose: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield items from a paginated list API, following nextLink/@odata.nextLink.
+
+    Pages are requested with the bearer token attached, so the first URL and every
+    nextLink must start with one of allowed_prefixes. When an executor is given, the
+    next page is requested on it as soon as the current page arrives; no further
+    page is requested once limit items are available. A consumer that stops early
+    cancels a prefetch that has not started yet.
+
+    Args:
+        fetch: Callable that requests one page and returns its decoded JSON
+        url: Request URL for the first page
+        params: Query parameters for the first page (nextLink already embeds them)
+        operation: Description of operation for error messages
+        allowed_prefixes: URL prefix(es) pages may be requested from
+        limit: Maximum number of items to yield (None or 0 for all)
+        executor: Executor to prefetch the next page on (None to fetch lazily)
+        verbose: Print per-page debug output
+
+    Yields:
+        Items from each page's "value" array
+
+    Raises:
+        ParsingError: If the first URL or a nextLink points outside allowed_prefixes
+    """
+    if not url.startswith(allowed_prefixes):
+        raise ParsingError(f"Unexpected nextLink host for {operation}", response_data=url[:500])
+
+    remaining = limit or None
+    prefetch: Future[dict[str, Any]] | None = None
+    try:
+        data = fetch(url, params)
+        while True:
+            values = data.get("value", [])
+            if verbose:
+                print(f"[DEBUG] Retrieved {len(values)} items for {operation}")
+
+            if remaining is not None and len(values) >= remaining:
+                yield from values[:remaining]
+                return
+
+            next_link = next((data[key] for key in NEXT_LINK_KEYS if data.get(key)), None)
+            if next_link:
+                if not next_link.startswith(allowed_prefixes):
+                    raise ParsingError(
+                        f"Unexpected nextLink host for {operation}",
+                        response_data=next_link[:500],
+                    )
+                if executor is not None:
+                    prefetch = executor.submit(fetch, next_link, None)
+
+            yield from values
+
+            if not next_link:
+                return
+            if remaining is not None:
+                remaining -= len(values)
+            if prefetch is not None:
+                data = prefetch.result()
+                prefetch = None
+            else:
+                data = fetch(next_link, None)
+    finally:
+        # Consumers may stop early (e.g. islice); drop a prefetch that hasn't started.
+        if prefetch is not None:
+            prefetch.cancel()
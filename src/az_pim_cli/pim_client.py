@@ -1,22 +1,63 @@
 """Azure PIM API client."""
 
 import os
+import threading
 import uuid
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from itertools import islice
+from types import TracebackType
 from typing import Any
 
 import requests
 
 from az_pim_cli.auth import AzureAuth, ipv4_only_context, should_use_ipv4_only
-from az_pim_cli.exceptions import NetworkError, ParsingError, PermissionError
+from az_pim_cli.exceptions import DNS_ERROR_MARKERS, NetworkError, ParsingError, PermissionError
+from az_pim_cli.jsonutil import loads_json
+from az_pim_cli.pagination import paginate
+from az_pim_cli.retry import send_with_retry
+from az_pim_cli.sessions import ThreadLocalSession
+from az_pim_cli.timeutil import utcnow_iso_z
+
+# Graph $select projections: only the fields the CLI renders are requested, which
+# keeps list payloads (and JSON decode time) small on large tenants.
+GRAPH_SCHEDULE_INSTANCE_SELECT = (
+    "id,principalId,roleDefinitionId,directoryScopeId,startDateTime,endDateTime,"
+    "assignmentType,memberType"
+)
+GRAPH_SCHEDULE_REQUEST_SELECT = (
+    "id,principalId,roleDefinitionId,directoryScopeId,status,createdDateTime,justification"
+)
 
 
 class PIMClient:
-    """Client for interacting with Azure PIM APIs."""
+    """Client for interacting with Azure PIM APIs.
+
+    Requests run on the calling thread or on the page prefetch executor. Each of
+    those threads uses its own requests.Session, so connections are reused per thread
+    and never shared. Close the client (or use it as a context manager) when done.
+    """
 
     GRAPH_API_BASE = "https://graph.microsoft.com/v1.0"
     GRAPH_API_BETA = "https://graph.microsoft.com/beta"
     ARM_API_BASE = "https://management.azure.com"
+    # Fixed endpoints, built once when the class is defined
+    ARM_ROLE_ELIGIBILITY_URL = (
+        f"{ARM_API_BASE}/providers/Microsoft.Authorization/roleEligibilityScheduleInstances"
+    )
+    GRAPH_ASSIGNMENT_REQUESTS_URL = (
+        f"{GRAPH_API_BETA}/roleManagement/directory/roleAssignmentScheduleRequests"
+    )
+    GRAPH_ASSIGNMENT_INSTANCES_URL = (
+        f"{GRAPH_API_BETA}/roleManagement/directory/roleAssignmentScheduleInstances"
+    )
+    HTTP_METHODS = frozenset({"GET", "POST", "PUT"})
+    # nextLink URLs are requested with the bearer token attached, so only links back
+    # to the API hosts this client talks to are followed.
+    NEXT_LINK_PREFIXES = (f"{ARM_API_BASE}/", "https://graph.microsoft.com/")
+    # Listings are consumed one at a time, each prefetching at most one page ahead
+    PREFETCH_WORKERS = 1
 
     def __init__(self, auth: AzureAuth | None = None, verbose: bool = False) -> None:
         """
@@ -30,10 +71,40 @@ class PIMClient:
         self.verbose = verbose
         self._backend = os.environ.get("AZ_PIM_BACKEND", "ARM").upper()
 
+        # requests.Session is not thread-safe; prefetch threads get their own
+        self._sessions = ThreadLocalSession()
+
+        # Page prefetches run here; created on first use and shut down by close()
+        self._prefetch_executor: ThreadPoolExecutor | None = None
+        self._prefetch_lock = threading.Lock()
+
         if self.verbose:
             print(f"[DEBUG] PIM Client initialized with backend: {self._backend}")
             print(f"[DEBUG] IPv4-only mode: {should_use_ipv4_only()}")
 
+    def close(self) -> None:
+        """Shut down page prefetching and close every thread's HTTP session."""
+        if self._prefetch_executor is not None:
+            self._prefetch_executor.shutdown(wait=True, cancel_futures=True)
+            self._prefetch_executor = None
+        self._sessions.close()
+
+    @property
+    def _session(self) -> requests.Session:
+        """The calling thread's HTTP session (see az_pim_cli.sessions)."""
+        return self._sessions.get()
+
+    def __enter__(self) -> "PIMClient":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
     def _get_headers(self, scope: str = "https://graph.microsoft.com/.default") -> dict[str, str]:
         """
         Get headers with authorization token.
@@ -48,6 +119,9 @@ class PIMClient:
         return {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
+            "Accept": "application/json",
+            # Large list pages compress well; requests decompresses transparently.
+            "Accept-Encoding": "gzip, deflate",
         }
 
     def _make_request(
@@ -77,29 +151,29 @@ class PIMClient:
             NetworkError: For DNS, timeout, and connection errors
             PermissionError: For 403 authorization errors
             ParsingError: For response parsing errors
+            ValueError: For HTTP methods outside HTTP_METHODS
         """
+        if method not in self.HTTP_METHODS:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        verbose = self.verbose
 
         def do_request() -> dict[str, Any]:
             try:
-                if self.verbose:
+                if verbose:
                     print(f"[DEBUG] {method} {url}")
                     if params:
                         print(f"[DEBUG] Params: {params}")
 
-                if method == "GET":
-                    response = requests.get(url, headers=headers, params=params, timeout=30)
-                elif method == "POST":
-                    response = requests.post(
-                        url, headers=headers, params=params, json=json_data, timeout=30
-                    )
-                elif method == "PUT":
-                    response = requests.put(
-                        url, headers=headers, params=params, json=json_data, timeout=30
+                def send() -> requests.Response:
+                    return self._session.request(
+                        method, url, headers=headers, params=params, json=json_data, timeout=30
                     )
-                else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
 
-                if self.verbose:
+                # POST creates a new request object, so it is not resent after a
+                # timeout, dropped connection or gateway error; only refusals are retried.
+                response = send_with_retry(send, idempotent=method != "POST")
+
+                if verbose:
                     print(f"[DEBUG] Response status: {response.status_code}")
 
                 # Handle specific HTTP errors
@@ -118,6 +192,8 @@ class PIMClient:
                 elif response.status_code == 401:
                     from az_pim_cli.exceptions import AuthenticationError
 
+                    # The cached token was rejected; make sure the next call refetches.
+                    self.auth.invalidate_token()
                     raise AuthenticationError(
                         f"Authentication failed for {operation}",
                         suggestion="Run 'az login' to refresh your authentication",
@@ -126,17 +202,17 @@ class PIMClient:
                 response.raise_for_status()
 
                 try:
-                    json_response: dict[str, Any] = response.json()
+                    json_response: dict[str, Any] = loads_json(response.content)
                     return json_response
                 except ValueError as e:
                     raise ParsingError(
                         f"Failed to parse JSON response for {operation}: {str(e)}",
-                        response_data=response.text[:500],
+                        response_data=response.content[:500].decode("utf-8", "replace"),
                     )
 
             except requests.exceptions.ConnectionError as e:
                 error_msg = str(e).lower()
-                suggest_ipv4 = "getaddrinfo failed" in error_msg or "name resolution" in error_msg
+                suggest_ipv4 = any(marker in error_msg for marker in DNS_ERROR_MARKERS)
 
                 hint = ""
                 if suggest_ipv4:
@@ -175,6 +251,59 @@ class PIMClient:
         else:
             return do_request()
 
+    def _get_prefetch_executor(self) -> ThreadPoolExecutor:
+        """
+        Get the executor that requests upcoming pages in the background.
+
+        Returns:
+            The client's prefetch executor, created on first use
+        """
+        with self._prefetch_lock:
+            if self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(
+                    max_workers=self.PREFETCH_WORKERS, thread_name_prefix="az-pim-prefetch"
+                )
+            return self._prefetch_executor
+
+    def _paginate(
+        self,
+        url: str,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        operation: str = "API request",
+        limit: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Yield items from a paginated GET, prefetching pages (see pagination.paginate).
+
+        Args:
+            url: Request URL for the first page
+            params: Query parameters for the first page (nextLink already embeds them)
+            headers: Request headers (defaults to Graph authorization headers)
+            operation: Description of operation for error messages
+            limit: Maximum number of items to yield (None or 0 for all)
+
+        Returns:
+            Iterator over items from each page's "value" array
+        """
+        request_headers = headers if headers is not None else self._get_headers()
+
+        def fetch(page_url: str, page_params: dict[str, Any] | None) -> dict[str, Any]:
+            return self._make_request(
+                "GET", page_url, request_headers, page_params, operation=operation
+            )
+
+        return paginate(
+            fetch,
+            url,
+            params,
+            operation=operation,
+            allowed_prefixes=self.NEXT_LINK_PREFIXES,
+            limit=limit,
+            executor=self._get_prefetch_executor(),
+            verbose=self.verbose,
+        )
+
     def list_role_assignments(
         self, principal_id: str | None = None, limit: int | None = None
     ) -> list[dict[str, Any]]:
@@ -191,40 +320,14 @@ class PIMClient:
         """
         # Use ARM API with asTarget() filter - this matches what Azure Portal uses
         # and works with standard Azure CLI permissions without requiring Graph API permissions
-        url = f"{self.ARM_API_BASE}/providers/Microsoft.Authorization/roleEligibilityScheduleInstances"
+        url = self.ARM_ROLE_ELIGIBILITY_URL
         params = {
             "api-version": "2020-10-01",
             "$filter": "asTarget()",  # Gets roles for the current authenticated user
         }
 
         headers = self._get_headers("https://management.azure.com/.default")
-
-        all_results = []
-        while True:
-            data = self._make_request(
-                "GET", url, headers, params, operation="list role assignments"
-            )
-
-            values = data.get("value", [])
-            all_results.extend(values)
-
-            if self.verbose:
-                print(f"[DEBUG] Retrieved {len(values)} roles (total: {len(all_results)})")
-
-            # Check if we've hit the limit
-            if limit and len(all_results) >= limit:
-                all_results = all_results[:limit]
-                break
-
-            # Handle pagination
-            next_link = data.get("nextLink")
-            if not next_link:
-                break
-
-            url = next_link
-            params = {}  # nextLink already includes params
-
-        return all_results
+        return list(self._paginate(url, params, headers, "list role assignments", limit))
 
     def list_resource_role_assignments(
         self, scope: str, principal_id: str | None = None, limit: int | None = None
@@ -255,37 +358,8 @@ class PIMClient:
             }
 
         headers = self._get_headers("https://management.azure.com/.default")
-
-        all_results = []
-        while True:
-            data = self._make_request(
-                "GET",
-                url,
-                headers,
-                params,
-                operation=f"list resource role assignments for scope {scope}",
-            )
-
-            values = data.get("value", [])
-            all_results.extend(values)
-
-            if self.verbose:
-                print(f"[DEBUG] Retrieved {len(values)} resource roles (total: {len(all_results)})")
-
-            # Check if we've hit the limit
-            if limit and len(all_results) >= limit:
-                all_results = all_results[:limit]
-                break
-
-            # Handle pagination
-            next_link = data.get("nextLink")
-            if not next_link:
-                break
-
-            url = next_link
-            params = {}  # nextLink already includes params
-
-        return all_results
+        operation = f"list resource role assignments for scope {scope}"
+        return list(self._paginate(url, params, headers, operation, limit))
 
     def request_role_activation(
         self,
@@ -313,7 +387,7 @@ class PIMClient:
         if principal_id is None:
             principal_id = self.auth.get_user_object_id()
 
-        url = f"{self.GRAPH_API_BETA}/roleManagement/directory/roleAssignmentScheduleRequests"
+        url = self.GRAPH_ASSIGNMENT_REQUESTS_URL
 
         payload = {
             "action": "selfActivate",
@@ -322,7 +396,7 @@ class PIMClient:
             "directoryScopeId": "/",
             "justification": justification,
             "scheduleInfo": {
-                "startDateTime": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "startDateTime": utcnow_iso_z(),
                 "expiration": {"type": "afterDuration", "duration": duration},
             },
         }
@@ -375,7 +449,7 @@ class PIMClient:
                 "requestType": "SelfActivate",
                 "justification": justification,
                 "scheduleInfo": {
-                    "startDateTime": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                    "startDateTime": utcnow_iso_z(),
                     "expiration": {"type": "AfterDuration", "duration": duration},
                 },
             }
@@ -412,13 +486,14 @@ class PIMClient:
         if principal_id is None:
             principal_id = self.auth.get_user_object_id()
 
-        url = f"{self.GRAPH_API_BETA}/roleManagement/directory/roleAssignmentScheduleRequests"
-        params = {"$filter": "status eq 'PendingApproval'"}
+        url = self.GRAPH_ASSIGNMENT_REQUESTS_URL
+        params = {
+            "$filter": "status eq 'PendingApproval'",
+            "$select": GRAPH_SCHEDULE_REQUEST_SELECT,
+        }
 
         headers = self._get_headers()
-        data = self._make_request("GET", url, headers, params, operation="list pending approvals")
-        values: list[dict[str, Any]] = data.get("value", [])
-        return values
+        return list(self._paginate(url, params, headers, "list pending approvals"))
 
     def approve_request(
         self, request_id: str, justification: str = "Approved via az-pim-cli"
@@ -433,7 +508,7 @@ class PIMClient:
         Returns:
             Approval response
         """
-        url = f"{self.GRAPH_API_BETA}/roleManagement/directory/roleAssignmentScheduleRequests/{request_id}/approve"
+        url = f"{self.GRAPH_ASSIGNMENT_REQUESTS_URL}/{request_id}/approve"
 
         payload = {"justification": justification}
 
@@ -459,13 +534,15 @@ class PIMClient:
         if principal_id is None:
             principal_id = self.auth.get_user_object_id()
 
-        url = f"{self.GRAPH_API_BETA}/roleManagement/directory/roleAssignmentScheduleInstances"
-        params = {"$filter": f"principalId eq '{principal_id}'", "$expand": "roleDefinition"}
+        url = self.GRAPH_ASSIGNMENT_INSTANCES_URL
+        params = {
+            "$filter": f"principalId eq '{principal_id}'",
+            "$select": GRAPH_SCHEDULE_INSTANCE_SELECT,
+            "$expand": "roleDefinition($select=id,displayName)",
+        }
 
         headers = self._get_headers()
-        data = self._make_request("GET", url, headers, params, operation="list activation history")
-        values: list[dict[str, Any]] = data.get("value", [])
-        return values
+        return list(self._paginate(url, params, headers, "list activation history"))
 
     def list_resource_activation_history(
         self,
@@ -493,50 +570,18 @@ class PIMClient:
         }
 
         headers = self._get_headers("https://management.azure.com/.default")
-        all_results: list[dict[str, Any]] = []
-
         lookback_cutoff = datetime.now(timezone.utc) - timedelta(days=days)
 
-        while True:
-            data = self._make_request(
-                "GET",
-                url,
-                headers,
-                params,
-                operation=f"list resource activation history for scope {scope}",
-            )
-
-            values = data.get("value", [])
-            for item in values:
-                props = item.get("properties", {})
-                created_on = props.get("createdOn")
-                start_date_time = props.get("scheduleInfo", {}).get("startDateTime")
-                dt_str = created_on or start_date_time
-                if not dt_str:
-                    all_results.append(item)
-                    continue
-
-                try:
-                    dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
-                    if dt >= lookback_cutoff:
-                        all_results.append(item)
-                except Exception:
-                    all_results.append(item)
-
-            if self.verbose:
-                print(
-                    f"[DEBUG] Retrieved {len(values)} requests (kept: {len(all_results)}) for scope {scope}"
-                )
-
-            if limit and len(all_results) >= limit:
-                all_results = all_results[:limit]
-                break
-
-            next_link = data.get("nextLink")
-            if not next_link:
-                break
-
-            url = next_link
-            params = {}
+        def in_lookback(item: dict[str, Any]) -> bool:
+            props = item.get("properties", {})
+            dt_str = props.get("createdOn") or props.get("scheduleInfo", {}).get("startDateTime")
+            if not dt_str:
+                return True
+            try:
+                return datetime.fromisoformat(dt_str.replace("Z", "+00:00")) >= lookback_cutoff
+            except Exception:
+                return True
 
-        return all_results
+        operation = f"list resource activation history for scope {scope}"
+        items = self._paginate(url, params, headers, operation)
+        return list(islice(filter(in_lookback, items), limit or None))
@@ -11,21 +11,45 @@ Required Permissions:
 - See docs/PERMISSIONS.md for detailed permission requirements
 """
 
+import threading
 import uuid
-from datetime import datetime, timezone
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from types import TracebackType
 from typing import Any
+from urllib.parse import urlencode
 
 import requests
 
 from az_pim_cli.auth import AzureAuth, ipv4_only_context, should_use_ipv4_only
-from az_pim_cli.exceptions import NetworkError, ParsingError, PermissionError
+from az_pim_cli.exceptions import DNS_ERROR_MARKERS, NetworkError, ParsingError, PermissionError
+from az_pim_cli.jsonutil import loads_json
+from az_pim_cli.pagination import paginate
+from az_pim_cli.retry import send_with_retry
+from az_pim_cli.sessions import ThreadLocalSession
+from az_pim_cli.timeutil import utcnow_iso_z
 
 
 class AzureARMProvider:
-    """Provider for Azure Resource Manager PIM APIs (Azure resource roles)."""
+    """Provider for Azure Resource Manager PIM APIs (Azure resource roles).
+
+    batch_list coalesces scopes into ARM /batch calls and lists any scope the batch
+    could not answer on a small thread pool; pages are prefetched on another. Every
+    thread gets its own requests.Session. Close the provider (or use it as a context
+    manager) when done.
+    """
 
     ARM_API_BASE = "https://management.azure.com"
     API_VERSION = "2020-10-01"
+    BATCH_API_VERSION = "2020-06-01"
+    BATCH_MAX_REQUESTS = 20  # ARM /batch accepts at most 20 requests per call
+    BATCH_URL = f"{ARM_API_BASE}/batch"
+    HTTP_METHODS = frozenset({"GET", "POST", "PUT"})
+    # nextLink URLs are requested with the bearer token attached; only follow ARM links
+    NEXT_LINK_PREFIX = f"{ARM_API_BASE}/"
+    MAX_SCOPE_WORKERS = 8
+    # One prefetch thread per concurrently paginated scope
+    PREFETCH_WORKERS = MAX_SCOPE_WORKERS
 
     def __init__(self, auth: AzureAuth | None = None, verbose: bool = False) -> None:
         """
@@ -38,9 +62,39 @@ class AzureARMProvider:
         self.auth = auth or AzureAuth()
         self.verbose = verbose
 
+        # requests.Session is not thread-safe; prefetch and fallback threads get their own
+        self._sessions = ThreadLocalSession()
+
+        # Page prefetches run here; created on first use and shut down by close()
+        self._prefetch_executor: ThreadPoolExecutor | None = None
+        self._prefetch_lock = threading.Lock()
+
         if self.verbose:
             print("[DEBUG] AzureARMProvider initialized")
 
+    def close(self) -> None:
+        """Shut down page prefetching and close every thread's HTTP session."""
+        if self._prefetch_executor is not None:
+            self._prefetch_executor.shutdown(wait=True, cancel_futures=True)
+            self._prefetch_executor = None
+        self._sessions.close()
+
+    @property
+    def _session(self) -> requests.Session:
+        """The calling thread's HTTP session (see az_pim_cli.sessions)."""
+        return self._sessions.get()
+
+    def __enter__(self) -> "AzureARMProvider":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
     def _get_headers(self) -> dict[str, str]:
         """
         Get headers with authorization token for ARM API.
@@ -52,6 +106,9 @@ class AzureARMProvider:
         return {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
+            "Accept": "application/json",
+            # Large list pages compress well; requests decompresses transparently.
+            "Accept-Encoding": "gzip, deflate",
         }
 
     def _make_request(
@@ -61,16 +118,18 @@ class AzureARMProvider:
         params: dict[str, Any] | None = None,
         json_data: dict[str, Any] | None = None,
         operation: str = "ARM API request",
+        headers: dict[str, str] | None = None,
     ) -> dict[str, Any]:
         """
         Make an HTTP request to ARM API with error handling.
 
         Args:
-            method: HTTP method (GET, PUT)
+            method: HTTP method (GET, POST, PUT)
             url: Request URL
             params: Query parameters
             json_data: JSON body
             operation: Description for error messages
+            headers: Request headers (defaults to ARM authorization headers)
 
         Returns:
             Response JSON data
@@ -79,28 +138,37 @@ class AzureARMProvider:
             NetworkError: For DNS, timeout, and connection errors
             PermissionError: For 403 authorization errors
             ParsingError: For response parsing errors
+            ValueError: For HTTP methods outside HTTP_METHODS
         """
+        if method not in self.HTTP_METHODS:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        verbose = self.verbose
 
         def do_request() -> dict[str, Any]:
             try:
-                headers = self._get_headers()
+                request_headers = headers if headers is not None else self._get_headers()
 
-                if self.verbose:
+                if verbose:
                     print(f"[DEBUG] {method} {url}")
                     if params:
                         print(f"[DEBUG] Params: {params}")
 
-                if method == "GET":
-                    response = requests.get(url, headers=headers, params=params, timeout=30)
-                elif method == "PUT":
-                    response = requests.put(
-                        url, headers=headers, params=params, json=json_data, timeout=30
+                def send() -> requests.Response:
+                    return self._session.request(
+                        method,
+                        url,
+                        headers=request_headers,
+                        params=params,
+                        json=json_data,
+                        timeout=30,
                     )
-                else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
+
+                # GET, PUT (named request resource) and POST /batch (a bundle of GETs)
+                # are idempotent, so transport errors are retried as well as throttling.
+                response = send_with_retry(send)
 
                 if response.status_code == 403:
-                    error_data = response.json() if response.text else {}
+                    error_data = loads_json(response.content) if response.content else {}
                     error_msg = error_data.get("error", {}).get(
                         "message", "Insufficient permissions"
                     )
@@ -111,7 +179,7 @@ class AzureARMProvider:
                     )
 
                 response.raise_for_status()
-                return response.json()  # type: ignore[no-any-return]
+                return loads_json(response.content)  # type: ignore[no-any-return]
 
             except requests.exceptions.Timeout:
                 raise NetworkError(
@@ -120,7 +188,8 @@ class AzureARMProvider:
                     suggest_ipv4=True,
                 )
             except requests.exceptions.ConnectionError as e:
-                if "getaddrinfo failed" in str(e) or "Name or service not known" in str(e):
+                error_msg = str(e).lower()
+                if any(marker in error_msg for marker in DNS_ERROR_MARKERS):
                     raise NetworkError(
                         f"DNS resolution failed for {operation}",
                         endpoint=url,
@@ -141,6 +210,58 @@ class AzureARMProvider:
         else:
             return do_request()
 
+    def _get_prefetch_executor(self) -> ThreadPoolExecutor:
+        """
+        Get the executor that requests upcoming pages in the background.
+
+        Returns:
+            The provider's prefetch executor, created on first use
+        """
+        with self._prefetch_lock:
+            if self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(
+                    max_workers=self.PREFETCH_WORKERS, thread_name_prefix="az-pim-prefetch"
+                )
+            return self._prefetch_executor
+
+    def _paginate(
+        self,
+        url: str,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        operation: str = "ARM API request",
+        limit: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Yield items from a paginated ARM list, prefetching pages (see pagination.paginate).
+
+        Args:
+            url: Request URL for the first page
+            params: Query parameters for the first page (nextLink already embeds them)
+            headers: Request headers (defaults to ARM authorization headers)
+            operation: Description for error messages
+            limit: Maximum number of items to yield (None or 0 for all)
+
+        Returns:
+            Iterator over items from each page's "value" array
+        """
+
+        def fetch(page_url: str, page_params: dict[str, Any] | None) -> dict[str, Any]:
+            return self._make_request(
+                "GET", page_url, page_params, operation=operation, headers=headers
+            )
+
+        return paginate(
+            fetch,
+            url,
+            params,
+            operation=operation,
+            allowed_prefixes=self.NEXT_LINK_PREFIX,
+            limit=limit,
+            executor=self._get_prefetch_executor(),
+            verbose=self.verbose,
+        )
+
     def list_eligible_roles(
         self, scope: str, principal_id: str | None = None, limit: int | None = None
     ) -> list[dict[str, Any]]:
@@ -171,30 +292,145 @@ class AzureARMProvider:
                 "$filter": f"principalId eq '{principal_id}'",
             }
 
-        all_results = []
-        while True:
-            data = self._make_request(
-                "GET", url, params, operation=f"list eligible Azure resource roles at {scope}"
-            )
+        operation = f"list eligible Azure resource roles at {scope}"
+        return list(self._paginate(url, params, None, operation, limit))
 
-            values = data.get("value", [])
-            all_results.extend(values)
+    def list_eligible_roles_for_scopes(
+        self, scopes: list[str], principal_id: str | None = None, limit: int | None = None
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        List eligible Azure resource roles for several scopes.
 
-            if self.verbose:
-                print(f"[DEBUG] Retrieved {len(values)} resource roles (total: {len(all_results)})")
+        Scopes are coalesced into ARM /batch calls (see batch_list), so N scopes
+        cost ceil(N/20) round trips instead of N.
 
-            if limit and len(all_results) >= limit:
-                all_results = all_results[:limit]
-                break
+        Args:
+            scopes: Resource scopes (subscriptions, resource groups, or resources)
+            principal_id: User object ID (defaults to current user with asTarget filter)
+            limit: Maximum number of results per scope
 
-            next_link = data.get("nextLink")
-            if not next_link:
-                break
+        Returns:
+            Mapping of scope to its role eligibility instances, in input order
+        """
+        return self.batch_list(scopes, "roleEligibilityScheduleInstances", principal_id, limit)
 
-            url = next_link
-            params = {}
+    def batch_list(
+        self,
+        scopes: list[str],
+        resource: str = "roleEligibilityScheduleInstances",
+        principal_id: str | None = None,
+        limit: int | None = None,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """
+        List a Microsoft.Authorization collection for several scopes via ARM /batch.
+
+        API: POST /batch?api-version=2020-06-01
+        Reference: https://learn.microsoft.com/en-us/azure/azure-resource-manager/management/request-limits-and-throttling
+
+        Scopes are sent in chunks of BATCH_MAX_REQUESTS. Any scope whose batch call
+        or sub-response fails is listed again through the regular per-scope path,
+        which also surfaces the usual permission/network errors.
+
+        Args:
+            scopes: Resource scopes
+            resource: Collection name (roleEligibilityScheduleInstances,
+                roleAssignmentScheduleInstances or roleAssignmentScheduleRequests)
+            principal_id: User object ID (defaults to current user with asTarget filter)
+            limit: Maximum number of results per scope
+
+        Returns:
+            Mapping of scope to its list results, in input order
+        """
+        per_scope_lists = {
+            "roleEligibilityScheduleInstances": self.list_eligible_roles,
+            "roleAssignmentScheduleInstances": self.list_active_assignments,
+            "roleAssignmentScheduleRequests": self.list_assignment_requests,
+        }
+        if resource not in per_scope_lists:
+            raise ValueError(f"Unsupported batch list resource: {resource}")
+
+        query = urlencode(
+            {
+                "api-version": self.API_VERSION,
+                "$filter": "asTarget()"
+                if principal_id is None
+                else f"principalId eq '{principal_id}'",
+            }
+        )
 
-        return all_results
+        unique_scopes = list(dict.fromkeys(scopes))
+        batched: dict[str, list[dict[str, Any]]] = {}
+        fallback: list[str] = []
+
+        for start in range(0, len(unique_scopes), self.BATCH_MAX_REQUESTS):
+            chunk = unique_scopes[start : start + self.BATCH_MAX_REQUESTS]
+            payload = {
+                "requests": [
+                    {
+                        "name": str(index),
+                        "httpMethod": "GET",
+                        "url": f"/{scope.lstrip('/')}/providers/Microsoft.Authorization/{resource}?{query}",
+                    }
+                    for index, scope in enumerate(chunk)
+                ]
+            }
+
+            try:
+                data = self._make_request(
+                    "POST",
+                    self.BATCH_URL,
+                    {"api-version": self.BATCH_API_VERSION},
+                    json_data=payload,
+                    operation=f"batch list {resource}",
+                )
+            except (NetworkError, PermissionError, ParsingError):
+                # e.g. /batch denied or unparsable; the per-scope calls report real errors
+                fallback.extend(chunk)
+                continue
+
+            responses = {r.get("name"): r for r in data.get("responses", [])}
+            for index, scope in enumerate(chunk):
+                response = responses.get(str(index))
+                if response is None or response.get("httpStatusCode") != 200:
+                    fallback.append(scope)
+                    continue
+
+                content = response.get("content") or {}
+                values = content.get("value", [])
+                next_link = content.get("nextLink")
+                if limit and len(values) >= limit:
+                    batched[scope] = values[:limit]
+                elif next_link:
+                    more = self._paginate(
+                        next_link,
+                        None,
+                        None,
+                        f"list {resource} at {scope}",
+                        limit - len(values) if limit else None,
+                    )
+                    batched[scope] = [*values, *more]
+                else:
+                    batched[scope] = values
+
+        if self.verbose:
+            print(
+                f"[DEBUG] Batched {len(batched)} scope(s), "
+                f"{len(fallback)} scope(s) falling back to per-scope calls"
+            )
+
+        if fallback:
+            list_scope = per_scope_lists[resource]
+            with ThreadPoolExecutor(
+                max_workers=min(len(fallback), self.MAX_SCOPE_WORKERS)
+            ) as executor:
+                futures = {
+                    scope: executor.submit(list_scope, scope, principal_id, limit)
+                    for scope in fallback
+                }
+            for scope, future in futures.items():
+                batched[scope] = future.result()
+
+        return {scope: batched[scope] for scope in unique_scopes}
 
     def activate_role(
         self,
@@ -237,7 +473,7 @@ class AzureARMProvider:
                 "requestType": "SelfActivate",
                 "justification": justification,
                 "scheduleInfo": {
-                    "startDateTime": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                    "startDateTime": utcnow_iso_z(),
                     "expiration": {"type": "AfterDuration", "duration": duration},
                 },
             }
@@ -289,27 +525,8 @@ class AzureARMProvider:
                 "$filter": f"principalId eq '{principal_id}'",
             }
 
-        all_results = []
-        while True:
-            data = self._make_request(
-                "GET", url, params, operation=f"list Azure resource role requests at {scope}"
-            )
-
-            values = data.get("value", [])
-            all_results.extend(values)
-
-            if limit and len(all_results) >= limit:
-                all_results = all_results[:limit]
-                break
-
-            next_link = data.get("nextLink")
-            if not next_link:
-                break
-
-            url = next_link
-            params = {}
-
-        return all_results
+        operation = f"list Azure resource role requests at {scope}"
+        return list(self._paginate(url, params, None, operation, limit))
 
     def list_active_assignments(
         self, scope: str, principal_id: str | None = None, limit: int | None = None
@@ -341,24 +558,5 @@ class AzureARMProvider:
                 "$filter": f"principalId eq '{principal_id}'",
             }
 
-        all_results = []
-        while True:
-            data = self._make_request(
-                "GET", url, params, operation=f"list active Azure resource roles at {scope}"
-            )
-
-            values = data.get("value", [])
-            all_results.extend(values)
-
-            if limit and len(all_results) >= limit:
-                all_results = all_results[:limit]
-                break
-
-            next_link = data.get("nextLink")
-            if not next_link:
-                break
-
-            url = next_link
-            params = {}
-
-        return all_results
+        operation = f"list active Azure resource roles at {scope}"
+        return list(self._paginate(url, params, None, operation, limit))
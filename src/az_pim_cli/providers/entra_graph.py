@@ -11,20 +11,67 @@ Required Permissions:
 - See docs/PERMISSIONS.md for detailed permission requirements
 """
 
-from datetime import datetime, timezone
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import TracebackType
 from typing import Any
 
 import requests
 
 from az_pim_cli.auth import AzureAuth, ipv4_only_context, should_use_ipv4_only
-from az_pim_cli.exceptions import NetworkError, ParsingError, PermissionError
+from az_pim_cli.exceptions import DNS_ERROR_MARKERS, NetworkError, ParsingError, PermissionError
+from az_pim_cli.jsonutil import loads_json
+from az_pim_cli.pagination import paginate
+from az_pim_cli.retry import send_with_retry
+from az_pim_cli.sessions import ThreadLocalSession
+from az_pim_cli.timeutil import utcnow_iso_z
+
+
+@lru_cache(maxsize=8)
+def _principal_filter(principal_id: str) -> str:
+    """Return the OData $filter matching schedules of a single principal."""
+    return f"principalId eq '{principal_id}'"
 
 
 class EntraGraphProvider:
-    """Provider for Microsoft Graph PIM APIs (Entra ID roles)."""
+    """Provider for Microsoft Graph PIM APIs (Entra ID roles).
+
+    Listings keep a connection to graph.microsoft.com alive across pages. Pages are
+    prefetched on background threads, each with its own requests.Session. Close the
+    provider (or use it as a context manager) when done.
+    """
 
     GRAPH_API_V1 = "https://graph.microsoft.com/v1.0"
     GRAPH_API_BETA = "https://graph.microsoft.com/beta"
+    # Fixed endpoints, built once when the class is defined
+    ELIGIBILITY_INSTANCES_URL = (
+        f"{GRAPH_API_BETA}/roleManagement/directory/roleEligibilityScheduleInstances"
+    )
+    ASSIGNMENT_REQUESTS_URL = (
+        f"{GRAPH_API_BETA}/roleManagement/directory/roleAssignmentScheduleRequests"
+    )
+    ASSIGNMENT_INSTANCES_URL = (
+        f"{GRAPH_API_BETA}/roleManagement/directory/roleAssignmentScheduleInstances"
+    )
+    HTTP_METHODS = frozenset({"GET", "POST"})
+    GRAPH_MAX_PAGE_SIZE = 999  # Upper bound Graph accepts for $top on these collections
+    # $select/$expand projections: only the fields callers render are requested, which
+    # keeps pages (and JSON decode time) small on large tenants.
+    ELIGIBILITY_INSTANCE_SELECT = (
+        "id,principalId,roleDefinitionId,directoryScopeId,startDateTime,endDateTime,memberType"
+    )
+    ASSIGNMENT_INSTANCE_SELECT = f"{ELIGIBILITY_INSTANCE_SELECT},assignmentType"
+    ASSIGNMENT_REQUEST_SELECT = (
+        "id,principalId,roleDefinitionId,directoryScopeId,action,status,createdDateTime,"
+        "justification"
+    )
+    ROLE_DEFINITION_EXPAND = "roleDefinition($select=id,displayName,templateId)"
+    # nextLink URLs are requested with the bearer token attached; only follow Graph links
+    NEXT_LINK_PREFIX = "https://graph.microsoft.com/"
+    # Listings are consumed one at a time, each prefetching at most one page ahead
+    PREFETCH_WORKERS = 1
 
     def __init__(self, auth: AzureAuth | None = None, verbose: bool = False) -> None:
         """
@@ -37,21 +84,60 @@ class EntraGraphProvider:
         self.auth = auth or AzureAuth()
         self.verbose = verbose
 
+        # Static headers live on each thread's session; only the bearer token varies
+        # per request. requests.Session is not thread-safe, so prefetch threads get their own.
+        self._sessions = ThreadLocalSession(
+            headers={"Content-Type": "application/json", "Accept": "application/json"}
+        )
+        # (token, headers) for the last token seen, swapped atomically for prefetch threads
+        self._auth_headers: tuple[str, dict[str, str]] | None = None
+
+        # Page prefetches run here; created on first use and shut down by close()
+        self._prefetch_executor: ThreadPoolExecutor | None = None
+        self._prefetch_lock = threading.Lock()
+
         if self.verbose:
             print("[DEBUG] EntraGraphProvider initialized")
 
+    def close(self) -> None:
+        """Shut down page prefetching and close every thread's HTTP session."""
+        if self._prefetch_executor is not None:
+            self._prefetch_executor.shutdown(wait=True, cancel_futures=True)
+            self._prefetch_executor = None
+        self._sessions.close()
+
+    @property
+    def _session(self) -> requests.Session:
+        """The calling thread's HTTP session (see az_pim_cli.sessions)."""
+        return self._sessions.get()
+
+    def __enter__(self) -> "EntraGraphProvider":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
     def _get_headers(self) -> dict[str, str]:
         """
-        Get headers with authorization token for Graph API.
+        Get the per-request authorization header for Graph API.
+
+        The same dict is returned for as long as the token is unchanged; static
+        headers such as Content-Type are set on the session.
 
         Returns:
             Headers dictionary
         """
         token = self.auth.get_token("https://graph.microsoft.com/.default")
-        return {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-        }
+        cached = self._auth_headers
+        if cached is None or cached[0] != token:
+            cached = (token, {"Authorization": f"Bearer {token}"})
+            self._auth_headers = cached
+        return cached[1]
 
     def _make_request(
         self,
@@ -60,6 +146,7 @@ class EntraGraphProvider:
         params: dict[str, Any] | None = None,
         json_data: dict[str, Any] | None = None,
         operation: str = "Graph API request",
+        headers: dict[str, str] | None = None,
     ) -> dict[str, Any]:
         """
         Make an HTTP request to Graph API with error handling.
@@ -70,6 +157,7 @@ class EntraGraphProvider:
             params: Query parameters
             json_data: JSON body
             operation: Description for error messages
+            headers: Request headers (defaults to the Graph authorization header)
 
         Returns:
             Response JSON data
@@ -78,28 +166,36 @@ class EntraGraphProvider:
             NetworkError: For DNS, timeout, and connection errors
             PermissionError: For 403 authorization errors
             ParsingError: For response parsing errors
+            ValueError: For HTTP methods outside HTTP_METHODS
         """
+        if method not in self.HTTP_METHODS:
+            raise ValueError(f"Unsupported HTTP method: {method}")
 
         def do_request() -> dict[str, Any]:
             try:
-                headers = self._get_headers()
+                request_headers = headers if headers is not None else self._get_headers()
 
                 if self.verbose:
                     print(f"[DEBUG] {method} {url}")
                     if params:
                         print(f"[DEBUG] Params: {params}")
 
-                if method == "GET":
-                    response = requests.get(url, headers=headers, params=params, timeout=30)
-                elif method == "POST":
-                    response = requests.post(
-                        url, headers=headers, params=params, json=json_data, timeout=30
+                def send() -> requests.Response:
+                    return self._session.request(
+                        method,
+                        url,
+                        headers=request_headers,
+                        params=params,
+                        json=json_data,
+                        timeout=30,
                     )
-                else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
+
+                # POST creates a new schedule request, so only GETs are retried after a
+                # timeout, dropped connection or gateway error; throttling is retried for both.
+                response = send_with_retry(send, idempotent=method != "POST")
 
                 if response.status_code == 403:
-                    error_data = response.json() if response.text else {}
+                    error_data = loads_json(response.content) if response.content else {}
                     error_msg = error_data.get("error", {}).get(
                         "message", "Insufficient permissions"
                     )
@@ -110,7 +206,7 @@ class EntraGraphProvider:
                     )
 
                 response.raise_for_status()
-                return response.json()  # type: ignore[no-any-return]
+                return loads_json(response.content)  # type: ignore[no-any-return]
 
             except requests.exceptions.Timeout:
                 raise NetworkError(
@@ -119,13 +215,15 @@ class EntraGraphProvider:
                     suggest_ipv4=True,
                 )
             except requests.exceptions.ConnectionError as e:
-                if "getaddrinfo failed" in str(e) or "Name or service not known" in str(e):
+                error_msg = str(e)
+                lowered = error_msg.lower()
+                if any(marker in lowered for marker in DNS_ERROR_MARKERS):
                     raise NetworkError(
                         f"DNS resolution failed for {operation}",
                         endpoint=url,
                         suggest_ipv4=True,
                     )
-                raise NetworkError(f"Connection error for {operation}: {e}", endpoint=url)
+                raise NetworkError(f"Connection error for {operation}: {error_msg}", endpoint=url)
             except requests.exceptions.RequestException as e:
                 if hasattr(e, "response") and e.response is not None:
                     if e.response.status_code == 403:
@@ -140,11 +238,80 @@ class EntraGraphProvider:
         else:
             return do_request()
 
-    def list_eligible_roles(
+    def _page_size(self, limit: int | None) -> str:
+        """
+        Get the $top page size for a list query.
+
+        Args:
+            limit: Maximum number of results the caller wants
+
+        Returns:
+            Largest page Graph allows, or the limit if that is smaller
+        """
+        if limit:
+            return str(min(limit, self.GRAPH_MAX_PAGE_SIZE))
+        return str(self.GRAPH_MAX_PAGE_SIZE)
+
+    def _get_prefetch_executor(self) -> ThreadPoolExecutor:
+        """
+        Get the executor that requests upcoming pages in the background.
+
+        Returns:
+            The provider's prefetch executor, created on first use
+        """
+        with self._prefetch_lock:
+            if self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(
+                    max_workers=self.PREFETCH_WORKERS, thread_name_prefix="az-pim-prefetch"
+                )
+            return self._prefetch_executor
+
+    def _paginate(
+        self,
+        url: str,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        operation: str = "Graph API request",
+        limit: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Yield items from a paginated Graph list, prefetching pages (see pagination.paginate).
+
+        Args:
+            url: Request URL for the first page
+            params: Query parameters for the first page (nextLink already embeds them)
+            headers: Request headers (defaults to the Graph authorization header)
+            operation: Description for error messages
+            limit: Maximum number of items to yield (None or 0 for all)
+
+        Returns:
+            Iterator over items from each page's "value" array
+        """
+
+        def fetch(page_url: str, page_params: dict[str, Any] | None) -> dict[str, Any]:
+            return self._make_request(
+                "GET", page_url, page_params, operation=operation, headers=headers
+            )
+
+        return paginate(
+            fetch,
+            url,
+            params,
+            operation=operation,
+            allowed_prefixes=self.NEXT_LINK_PREFIX,
+            limit=limit,
+            executor=self._get_prefetch_executor(),
+            verbose=self.verbose,
+        )
+
+    def iter_eligible_roles(
         self, principal_id: str | None = None, limit: int | None = None
-    ) -> list[dict[str, Any]]:
+    ) -> Iterator[dict[str, Any]]:
         """
-        List eligible Entra ID roles for a user.
+        Iterate over eligible Entra ID roles for a user.
+
+        Items are yielded while pages are still being fetched, so callers that stop
+        early (e.g. after the first match) never request the remaining pages.
 
         API: GET /roleManagement/directory/roleEligibilityScheduleInstances
         Reference: https://learn.microsoft.com/en-us/graph/api/rbacapplication-list-roleeligibilityscheduleinstances
@@ -154,39 +321,36 @@ class EntraGraphProvider:
             limit: Maximum number of results
 
         Returns:
-            List of role eligibility instances
+            Iterator over role eligibility instances
         """
         if principal_id is None:
             principal_id = self.auth.get_user_object_id()
 
-        url = f"{self.GRAPH_API_BETA}/roleManagement/directory/roleEligibilityScheduleInstances"
+        url = self.ELIGIBILITY_INSTANCES_URL
         params = {
-            "$filter": f"principalId eq '{principal_id}'",
-            "$expand": "roleDefinition",
+            "$filter": _principal_filter(principal_id),
+            "$select": self.ELIGIBILITY_INSTANCE_SELECT,
+            "$expand": self.ROLE_DEFINITION_EXPAND,
+            "$top": self._page_size(limit),
         }
 
-        all_results = []
-        while True:
-            data = self._make_request("GET", url, params, operation="list eligible Entra roles")
-
-            values = data.get("value", [])
-            all_results.extend(values)
+        operation = "list eligible Entra roles"
+        return self._paginate(url, params, None, operation, limit)
 
-            if self.verbose:
-                print(f"[DEBUG] Retrieved {len(values)} Entra roles (total: {len(all_results)})")
-
-            if limit and len(all_results) >= limit:
-                all_results = all_results[:limit]
-                break
-
-            next_link = data.get("@odata.nextLink")
-            if not next_link:
-                break
+    def list_eligible_roles(
+        self, principal_id: str | None = None, limit: int | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        List eligible Entra ID roles for a user.
 
-            url = next_link
-            params = {}
+        Args:
+            principal_id: User object ID (defaults to current user)
+            limit: Maximum number of results
 
-        return all_results
+        Returns:
+            List of role eligibility instances
+        """
+        return list(self.iter_eligible_roles(principal_id, limit))
 
     def activate_role(
         self,
@@ -217,7 +381,7 @@ class EntraGraphProvider:
         if principal_id is None:
             principal_id = self.auth.get_user_object_id()
 
-        url = f"{self.GRAPH_API_BETA}/roleManagement/directory/roleAssignmentScheduleRequests"
+        url = self.ASSIGNMENT_REQUESTS_URL
 
         payload = {
             "action": "selfActivate",
@@ -226,7 +390,7 @@ class EntraGraphProvider:
             "directoryScopeId": "/",
             "justification": justification,
             "scheduleInfo": {
-                "startDateTime": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "startDateTime": utcnow_iso_z(),
                 "expiration": {"type": "afterDuration", "duration": duration},
             },
         }
@@ -236,11 +400,11 @@ class EntraGraphProvider:
 
         return self._make_request("POST", url, json_data=payload, operation="activate Entra role")
 
-    def list_assignment_requests(
+    def iter_assignment_requests(
         self, principal_id: str | None = None, limit: int | None = None
-    ) -> list[dict[str, Any]]:
+    ) -> Iterator[dict[str, Any]]:
         """
-        List role assignment requests (history).
+        Iterate over role assignment requests (history).
 
         API: GET /roleManagement/directory/roleAssignmentScheduleRequests
         Reference: https://learn.microsoft.com/en-us/graph/api/rbacapplication-list-roleassignmentschedulerequests
@@ -250,38 +414,36 @@ class EntraGraphProvider:
             limit: Maximum number of results
 
         Returns:
-            List of assignment requests
+            Iterator over assignment requests
         """
         if principal_id is None:
             principal_id = self.auth.get_user_object_id()
 
-        url = f"{self.GRAPH_API_BETA}/roleManagement/directory/roleAssignmentScheduleRequests"
+        url = self.ASSIGNMENT_REQUESTS_URL
         params = {
-            "$filter": f"principalId eq '{principal_id}'",
+            "$filter": _principal_filter(principal_id),
             "$orderby": "createdDateTime desc",
+            "$select": self.ASSIGNMENT_REQUEST_SELECT,
+            "$top": self._page_size(limit),
         }
 
-        all_results = []
-        while True:
-            data = self._make_request(
-                "GET", url, params, operation="list Entra role assignment requests"
-            )
-
-            values = data.get("value", [])
-            all_results.extend(values)
+        operation = "list Entra role assignment requests"
+        return self._paginate(url, params, None, operation, limit)
 
-            if limit and len(all_results) >= limit:
-                all_results = all_results[:limit]
-                break
-
-            next_link = data.get("@odata.nextLink")
-            if not next_link:
-                break
+    def list_assignment_requests(
+        self, principal_id: str | None = None, limit: int | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        List role assignment requests (history).
 
-            url = next_link
-            params = {}
+        Args:
+            principal_id: User object ID (defaults to current user)
+            limit: Maximum number of results
 
-        return all_results
+        Returns:
+            List of assignment requests
+        """
+        return list(self.iter_assignment_requests(principal_id, limit))
 
     def list_pending_approvals(self) -> list[dict[str, Any]]:
         """
@@ -293,7 +455,7 @@ class EntraGraphProvider:
         Returns:
             List of pending approval requests
         """
-        url = f"{self.GRAPH_API_BETA}/roleManagement/directory/roleAssignmentScheduleRequests/filterByCurrentUser(on='approver')"
+        url = f"{self.ASSIGNMENT_REQUESTS_URL}/filterByCurrentUser(on='approver')"
         params = {"$filter": "status eq 'PendingApproval'"}
 
         data = self._make_request("GET", url, params, operation="list pending Entra role approvals")
@@ -316,18 +478,18 @@ class EntraGraphProvider:
         Returns:
             Approval response
         """
-        url = f"{self.GRAPH_API_BETA}/roleManagement/directory/roleAssignmentScheduleRequests/{request_id}/approve"
+        url = f"{self.ASSIGNMENT_REQUESTS_URL}/{request_id}/approve"
         payload = {"justification": justification}
 
         return self._make_request(
             "POST", url, json_data=payload, operation="approve Entra role request"
         )
 
-    def list_active_assignments(
+    def iter_active_assignments(
         self, principal_id: str | None = None, limit: int | None = None
-    ) -> list[dict[str, Any]]:
+    ) -> Iterator[dict[str, Any]]:
         """
-        List active Entra ID role assignments.
+        Iterate over active Entra ID role assignments.
 
         API: GET /roleManagement/directory/roleAssignmentScheduleInstances
         Reference: https://learn.microsoft.com/en-us/graph/api/rbacapplication-list-roleassignmentscheduleinstances
@@ -337,35 +499,33 @@ class EntraGraphProvider:
             limit: Maximum number of results
 
         Returns:
-            List of active role assignments
+            Iterator over active role assignments
         """
         if principal_id is None:
             principal_id = self.auth.get_user_object_id()
 
-        url = f"{self.GRAPH_API_BETA}/roleManagement/directory/roleAssignmentScheduleInstances"
+        url = self.ASSIGNMENT_INSTANCES_URL
         params = {
-            "$filter": f"principalId eq '{principal_id}'",
-            "$expand": "roleDefinition",
+            "$filter": _principal_filter(principal_id),
+            "$select": self.ASSIGNMENT_INSTANCE_SELECT,
+            "$expand": self.ROLE_DEFINITION_EXPAND,
+            "$top": self._page_size(limit),
         }
 
-        all_results = []
-        while True:
-            data = self._make_request(
-                "GET", url, params, operation="list active Entra role assignments"
-            )
-
-            values = data.get("value", [])
-            all_results.extend(values)
+        operation = "list active Entra role assignments"
+        return self._paginate(url, params, None, operation, limit)
 
-            if limit and len(all_results) >= limit:
-                all_results = all_results[:limit]
-                break
-
-            next_link = data.get("@odata.nextLink")
-            if not next_link:
-                break
+    def list_active_assignments(
+        self, principal_id: str | None = None, limit: int | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        List active Entra ID role assignments.
 
-            url = next_link
-            params = {}
+        Args:
+            principal_id: User object ID (defaults to current user)
+            limit: Maximum number of results
 
-        return all_results
+        Returns:
+            List of active role assignments
+        """
+        return list(self.iter_active_assignments(principal_id, limit))
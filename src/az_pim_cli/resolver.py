@@ -4,16 +4,20 @@ Provides intelligent matching for user inputs (scopes, roles, resource groups, e
 with support for exact, case-insensitive, prefix, and fuzzy matching strategies.
 """
 
-import difflib
+import heapq
+import math
 import sys
 import time
+from bisect import bisect_left
+from collections import OrderedDict
 from collections.abc import Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any
 
-from rich.console import Console
+from rich.console import Console, Group
 from rich.prompt import Prompt
+from rich.text import Text
 
 # Optional fuzzy matching with rapidfuzz
 try:
@@ -24,6 +28,53 @@ except ImportError:
     HAS_RAPIDFUZZ = False
 
 
+def _pattern_masks(pattern: str) -> dict[str, int]:
+    """
+    Build per-character position bitmasks for bit-parallel matching.
+
+    Args:
+        pattern: String whose character positions are encoded
+
+    Returns:
+        Mapping of character to a bitmask with bit i set where pattern[i] is that character
+    """
+    masks: dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << i)
+    return masks
+
+
+def _similarity(pattern: str, masks: dict[str, int], text: str) -> float:
+    """
+    Compute the normalized InDel similarity of two strings.
+
+    Uses the bit-parallel LCS recurrence (Allison-Dix/Hyyrö), which processes
+    one character of text per step across all pattern positions at once.
+    The score is 2 * LCS / (len(pattern) + len(text)), the same measure as
+    rapidfuzz's fuzz.ratio.
+
+    Args:
+        pattern: Query string
+        masks: _pattern_masks(pattern), precomputed once per query
+        text: Candidate string
+
+    Returns:
+        Similarity between 0.0 and 1.0
+    """
+    total = len(pattern) + len(text)
+    if not total:
+        return 1.0
+
+    full = (1 << len(pattern)) - 1
+    v = full
+    for char in text:
+        u = v & masks.get(char, 0)
+        v = ((v + u) | (v - u)) & full
+
+    lcs = len(pattern) - v.bit_count()
+    return 2.0 * lcs / total
+
+
 class MatchStrategy(Enum):
     """Matching strategy for input resolution."""
 
@@ -33,7 +84,7 @@ class MatchStrategy(Enum):
     FUZZY = "fuzzy"
 
 
-@dataclass
+@dataclass(slots=True)
 class Match:
     """A matched item with metadata."""
 
@@ -44,6 +95,83 @@ class Match:
 
 
 @dataclass
+class CandidateIndex:
+    """Candidate names extracted once, in parallel lists, for repeated matching."""
+
+    candidates: list[Any]
+    names: list[str]
+    lower_names: list[str]
+    # name -> positions in candidates, for exact and case-insensitive lookups
+    name_positions: dict[str, list[int]]
+    lower_positions: dict[str, list[int]]
+    # Lowercased names in sorted order (with their positions) for prefix lookups
+    sorted_lower: list[str]
+    sorted_positions: list[int]
+    # user input -> suggestions already computed against these names
+    suggestions: dict[str, list[str]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, candidates: list[Any], name_extractor: Callable[[Any], str]) -> "CandidateIndex":
+        """
+        Extract and lowercase the name of every candidate.
+
+        Args:
+            candidates: Candidate items
+            name_extractor: Function to extract name/ID from candidate
+
+        Returns:
+            Index over the candidates
+        """
+        # Interned so the same role/scope names cached under many keys share one
+        # string object, and index lookups hit the identity fast path. sys.intern
+        # only accepts exact str, so str subclasses are converted first; a missing
+        # name (None) from a partial API payload becomes "", which no non-empty
+        # input matches and which never scores as a suggestion.
+        raw_names = (name_extractor(c) for c in candidates)
+        names = [sys.intern("" if name is None else str(name)) for name in raw_names]
+        lower_names = [sys.intern(name.lower()) for name in names]
+
+        name_positions: dict[str, list[int]] = {}
+        lower_positions: dict[str, list[int]] = {}
+        for i, (name, lower) in enumerate(zip(names, lower_names)):
+            name_positions.setdefault(name, []).append(i)
+            lower_positions.setdefault(lower, []).append(i)
+
+        sorted_positions = sorted(range(len(lower_names)), key=lower_names.__getitem__)
+        sorted_lower = [lower_names[i] for i in sorted_positions]
+
+        return cls(
+            candidates,
+            names,
+            lower_names,
+            name_positions,
+            lower_positions,
+            sorted_lower,
+            sorted_positions,
+        )
+
+    def prefix_positions(self, prefix: str) -> list[int]:
+        """
+        Find candidates whose lowercased name starts with prefix.
+
+        Args:
+            prefix: Lowercased prefix
+
+        Returns:
+            Positions of matching candidates, in candidate order
+        """
+        # Names sharing a prefix are contiguous in sorted order, starting at the
+        # insertion point of the prefix itself.
+        positions = []
+        for i in range(bisect_left(self.sorted_lower, prefix), len(self.sorted_lower)):
+            if not self.sorted_lower[i].startswith(prefix):
+                break
+            positions.append(self.sorted_positions[i])
+        positions.sort()
+        return positions
+
+
+@dataclass(slots=True)
 class CacheEntry:
     """Cached data with TTL."""
 
@@ -54,6 +182,14 @@ class CacheEntry:
 class InputResolver:
     """Resolve user inputs with intelligent matching and caching."""
 
+    FUZZY_MATCH_LIMIT = 10  # Best fuzzy matches offered for one input
+    SUGGESTION_CUTOFF = 0.4  # Lower than fuzzy_threshold: suggestions are only hints
+    CACHE_MAX_ENTRIES = 256  # Least recently used entries are evicted beyond this
+    STRATEGY_DESCRIPTIONS = {
+        MatchStrategy.CASE_INSENSITIVE: "case-insensitive match",
+        MatchStrategy.PREFIX: "prefix match",
+    }
+
     def __init__(
         self,
         fuzzy_enabled: bool = True,
@@ -74,7 +210,10 @@ class InputResolver:
         self.fuzzy_threshold = fuzzy_threshold
         self.cache_ttl_seconds = cache_ttl_seconds
         self.is_tty = is_tty if is_tty is not None else sys.stdout.isatty()
-        self._cache: dict[str, CacheEntry] = {}
+        # Insertion-ordered by recency of use, so the first entry is the LRU one
+        self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
+        # cache_key -> name index over the candidate list last resolved under that key
+        self._indexes: dict[str, CandidateIndex] = {}
         self.console = Console()
 
     def resolve(
@@ -95,7 +234,8 @@ class InputResolver:
             name_extractor: Function to extract name/ID from candidate
             context: Context for error messages (e.g., "scope", "role")
             allow_interactive: Allow interactive selection in TTY mode
-            cache_key: Optional cache key for candidates
+            cache_key: Optional cache key for candidates; names extracted from the
+                same candidate list are reused across calls with this key
 
         Returns:
             Matched item or None if no match found
@@ -111,11 +251,14 @@ class InputResolver:
             self._show_error(f"{context.capitalize()} input is required")
             return None
 
+        # Extract names once; the no-match path reuses them for suggestions
+        index = self._get_index(candidates, name_extractor, cache_key)
+
         # Try matching strategies in order
-        matches = self._find_matches(user_input, candidates, name_extractor)
+        matches = self._find_matches(user_input, index)
 
         if not matches:
-            self._show_no_match_error(user_input, candidates, name_extractor, context)
+            self._show_no_match_error(user_input, index, context)
             return None
 
         if len(matches) == 1:
@@ -127,47 +270,53 @@ class InputResolver:
         # Multiple matches - handle based on TTY mode
         return self._handle_multiple_matches(matches, user_input, context, allow_interactive)
 
-    def _find_matches(
+    def _get_index(
         self,
-        user_input: str,
         candidates: list[Any],
         name_extractor: Callable[[Any], str],
-    ) -> list[Match]:
+        cache_key: str | None,
+    ) -> CandidateIndex:
+        """Return the name index for candidates, reusing the one cached under cache_key."""
+        if cache_key is not None:
+            index = self._indexes.get(cache_key)
+            if index is not None and index.candidates is candidates:
+                return index
+
+        index = CandidateIndex.build(candidates, name_extractor)
+        # Indexes live only as long as their cache entry, so both stay bounded
+        if cache_key is not None and cache_key in self._cache:
+            self._indexes[cache_key] = index
+        return index
+
+    def _find_matches(self, user_input: str, index: CandidateIndex) -> list[Match]:
         """Find all matching candidates using various strategies."""
-        # Extract names once
-        candidate_names = [(c, name_extractor(c)) for c in candidates]
-
         # 1. Exact match
-        exact_matches = [
-            Match(c, name, MatchStrategy.EXACT, 1.0)
-            for c, name in candidate_names
-            if name == user_input
-        ]
-        if exact_matches:
-            return exact_matches
+        positions = index.name_positions.get(user_input)
+        if positions:
+            return [
+                Match(index.candidates[i], user_input, MatchStrategy.EXACT, 1.0) for i in positions
+            ]
 
         # 2. Case-insensitive match
         user_lower = user_input.lower()
-        ci_matches = [
-            Match(c, name, MatchStrategy.CASE_INSENSITIVE, 0.95)
-            for c, name in candidate_names
-            if name.lower() == user_lower
-        ]
-        if ci_matches:
-            return ci_matches
+        positions = index.lower_positions.get(user_lower)
+        if positions:
+            return [
+                Match(index.candidates[i], index.names[i], MatchStrategy.CASE_INSENSITIVE, 0.95)
+                for i in positions
+            ]
 
         # 3. Prefix match (case-insensitive)
         prefix_matches = [
-            Match(c, name, MatchStrategy.PREFIX, 0.9)
-            for c, name in candidate_names
-            if name.lower().startswith(user_lower)
+            Match(index.candidates[i], index.names[i], MatchStrategy.PREFIX, 0.9)
+            for i in index.prefix_positions(user_lower)
         ]
         if prefix_matches:
             return prefix_matches
 
         # 4. Fuzzy match (if enabled)
         if self.fuzzy_enabled:
-            return self._fuzzy_match(user_input, candidate_names)
+            return self._fuzzy_match(user_input, list(zip(index.candidates, index.names)))
 
         return []
 
@@ -175,10 +324,31 @@ class InputResolver:
         self,
         user_input: str,
         candidate_names: list[tuple[Any, str]],
+        limit: int | None = None,
     ) -> list[Match]:
-        """Perform fuzzy matching using available library."""
-        names = [name for _, name in candidate_names]
+        """
+        Perform fuzzy matching using available library.
+
+        Args:
+            user_input: User-provided input to match
+            candidate_names: (candidate, name) pairs
+            limit: Maximum number of matches (defaults to FUZZY_MATCH_LIMIT)
+
+        Returns:
+            Matches scoring at least fuzzy_threshold, best first
+        """
+        limit = limit or self.FUZZY_MATCH_LIMIT
         name_to_candidate = {name: c for c, name in candidate_names}
+        threshold = self.fuzzy_threshold
+
+        # A score of at least t needs 2 * min(len_a, len_b) / (len_a + len_b) >= t,
+        # so names whose length is too far from the input's can never match.
+        names = list(name_to_candidate)
+        if threshold > 0:
+            length = len(user_input)
+            min_len = math.ceil(length * threshold / (2 - threshold) - 1e-9)
+            max_len = math.floor(length * (2 - threshold) / threshold + 1e-9)
+            names = [name for name in names if min_len <= len(name) <= max_len]
 
         if HAS_RAPIDFUZZ:
             # Use rapidfuzz for better performance
@@ -186,7 +356,8 @@ class InputResolver:
                 user_input,
                 names,
                 scorer=fuzz.ratio,
-                limit=None,
+                limit=limit,
+                score_cutoff=threshold * 100,
             )
             matches = [
                 Match(
@@ -196,24 +367,19 @@ class InputResolver:
                     score / 100.0,
                 )
                 for name, score, _ in results
-                if score / 100.0 >= self.fuzzy_threshold
             ]
         else:
-            # Fall back to difflib
-            close_matches = difflib.get_close_matches(
-                user_input,
-                names,
-                n=10,
-                cutoff=self.fuzzy_threshold,
+            # Fall back to the built-in bit-parallel scorer
+            masks = _pattern_masks(user_input)
+            scored = ((_similarity(user_input, masks, name), name) for name in names)
+            best = heapq.nlargest(
+                limit,
+                (item for item in scored if item[0] >= threshold),
+                key=lambda item: item[0],
             )
             matches = [
-                Match(
-                    name_to_candidate[name],
-                    name,
-                    MatchStrategy.FUZZY,
-                    difflib.SequenceMatcher(None, user_input, name).ratio(),
-                )
-                for name in close_matches
+                Match(name_to_candidate[name], name, MatchStrategy.FUZZY, score)
+                for score, name in best
             ]
 
         # Sort by score descending
@@ -236,55 +402,63 @@ class InputResolver:
 
     def _interactive_select(self, matches: list[Match], context: str) -> Any | None:
         """Show interactive selection prompt."""
-        self.console.print(f"\n[yellow]Multiple {context}s match your input:[/yellow]")
-
+        # Styled Text spans instead of markup: the list is printed in one call and
+        # names containing "[" are shown verbatim rather than parsed as tags.
+        lines = [Text(f"\nMultiple {context}s match your input:", style="yellow")]
         for i, match in enumerate(matches, 1):
-            score_str = (
-                f" [dim](score: {match.score:.0%})[/dim]"
-                if match.strategy == MatchStrategy.FUZZY
-                else ""
-            )
-            self.console.print(f"  [cyan]{i}.[/cyan] {match.name}{score_str}")
+            line = Text.assemble("  ", (f"{i}.", "cyan"), f" {match.name}")
+            if match.strategy == MatchStrategy.FUZZY:
+                line.append(f" (score: {match.score:.0%})", style="dim")
+            lines.append(line)
+        self.console.print(Group(*lines))
 
         try:
-            choice = Prompt.ask(
-                "\nSelect number",
-                choices=[str(i) for i in range(1, len(matches) + 1)],
-                default="1",
-            )
-            return matches[int(choice) - 1].item
+            # Validate by range rather than passing Prompt a list of every number
+            while True:
+                choice = Prompt.ask(f"\nSelect number [1-{len(matches)}]", default="1")
+                try:
+                    index = int(choice)
+                except ValueError:
+                    # Also covers digits int() rejects, e.g. superscripts ("²")
+                    index = 0
+                if 1 <= index <= len(matches):
+                    return matches[index - 1].item
+                self.console.print(f"[red]Please enter a number from 1 to {len(matches)}[/red]")
         except (KeyboardInterrupt, EOFError):
             self.console.print("\n[yellow]Selection cancelled[/yellow]")
             return None
 
     def _show_match_info(self, match: Match, context: str) -> None:
         """Show information about a non-exact match."""
-        strategy_msg = {
-            MatchStrategy.CASE_INSENSITIVE: "case-insensitive match",
-            MatchStrategy.PREFIX: "prefix match",
-            MatchStrategy.FUZZY: f"fuzzy match (score: {match.score:.0%})",
-        }
-        msg = strategy_msg.get(match.strategy, "match")
+        if match.strategy == MatchStrategy.FUZZY:
+            msg = f"fuzzy match (score: {match.score:.0%})"
+        else:
+            msg = self.STRATEGY_DESCRIPTIONS.get(match.strategy, "match")
         self.console.print(f"[dim]Using {context} '{match.name}' ({msg})[/dim]", style="dim")
 
     def _show_no_match_error(
         self,
         user_input: str,
-        candidates: list[Any],
-        name_extractor: Callable[[Any], str],
+        index: CandidateIndex,
         context: str,
     ) -> None:
         """Show error with suggestions when no match found."""
-        self.console.print(f"[red]✗[/red] {context.capitalize()} '{user_input}' not found")
+        lines = [Text.assemble(("✗", "red"), f" {context.capitalize()} '{user_input}' not found")]
 
-        # Show suggestions (top 3)
-        suggestions = self._get_suggestions(user_input, candidates, name_extractor)
+        # Show suggestions (top 3), remembered per index for repeated typos
+        suggestions = index.suggestions.get(user_input)
+        if suggestions is None:
+            suggestions = self._get_suggestions(user_input, index.names)
+            index.suggestions[user_input] = suggestions
         if suggestions:
-            self.console.print("\n[yellow]Did you mean:[/yellow]")
-            for i, name in enumerate(suggestions, 1):
-                self.console.print(f"  [cyan]{i}.[/cyan] {name}")
+            lines.append(Text("\nDid you mean:", style="yellow"))
+            lines.extend(
+                Text.assemble("  ", (f"{i}.", "cyan"), f" {name}")
+                for i, name in enumerate(suggestions, 1)
+            )
 
-        self.console.print(f"\n[dim]Tip: Run 'az-pim list' to see all available {context}s[/dim]")
+        lines.append(Text(f"\nTip: Run 'az-pim list' to see all available {context}s", style="dim"))
+        self.console.print(Group(*lines))
 
     def _show_multiple_matches_error(
         self,
@@ -293,17 +467,19 @@ class InputResolver:
         context: str,
     ) -> None:
         """Show error for multiple matches in non-interactive mode."""
-        self.console.print(
-            f"[red]✗[/red] Multiple {context}s match '{user_input}' (non-interactive mode)"
-        )
-        self.console.print("\n[yellow]Matching candidates:[/yellow]")
-        for match in matches[:5]:  # Show top 5
-            self.console.print(f"  • {match.name}")
+        lines = [
+            Text.assemble(
+                ("✗", "red"), f" Multiple {context}s match '{user_input}' (non-interactive mode)"
+            ),
+            Text("\nMatching candidates:", style="yellow"),
+        ]
+        lines.extend(Text(f"  • {match.name}") for match in matches[:5])  # Show top 5
 
         if len(matches) > 5:
-            self.console.print(f"  [dim]...and {len(matches) - 5} more[/dim]")
+            lines.append(Text(f"  ...and {len(matches) - 5} more", style="dim"))
 
-        self.console.print("\n[dim]Tip: Use exact name/ID or run in interactive mode[/dim]")
+        lines.append(Text("\nTip: Use exact name/ID or run in interactive mode", style="dim"))
+        self.console.print(Group(*lines))
 
     def _show_error(self, message: str) -> None:
         """Show error message."""
@@ -312,48 +488,61 @@ class InputResolver:
     def _get_suggestions(
         self,
         user_input: str,
-        candidates: list[Any],
-        name_extractor: Callable[[Any], str],
+        names: list[str],
         max_suggestions: int = 3,
     ) -> list[str]:
-        """Get suggested candidates for user input."""
-        names = [name_extractor(c) for c in candidates]
-
+        """Get suggested candidate names for user input."""
         if HAS_RAPIDFUZZ:
+            score_cutoff = self.SUGGESTION_CUTOFF * 100
+            if max_suggestions == 1:
+                best_match = process.extractOne(
+                    user_input, names, scorer=fuzz.ratio, score_cutoff=score_cutoff
+                )
+                return [best_match[0]] if best_match else []
             results = process.extract(
                 user_input,
                 names,
                 scorer=fuzz.ratio,
                 limit=max_suggestions,
+                score_cutoff=score_cutoff,
             )
             return [name for name, _, _ in results]
         else:
-            return difflib.get_close_matches(
-                user_input,
-                names,
-                n=max_suggestions,
-                cutoff=0.4,  # Lower threshold for suggestions
+            masks = _pattern_masks(user_input)
+            scored = ((_similarity(user_input, masks, name), name) for name in names)
+            best = heapq.nlargest(
+                max_suggestions,
+                (item for item in scored if item[0] >= self.SUGGESTION_CUTOFF),
+                key=lambda item: item[0],
             )
+            return [name for _, name in best]
 
     def get_cached(self, key: str) -> Any | None:
         """Get cached data if not expired."""
-        if key not in self._cache:
+        entry = self._cache.get(key)
+        if entry is None:
             return None
 
-        entry = self._cache[key]
         if time.time() - entry.timestamp > self.cache_ttl_seconds:
             del self._cache[key]
+            self._indexes.pop(key, None)
             return None
 
+        self._cache.move_to_end(key)
         return entry.data
 
     def set_cache(self, key: str, data: Any) -> None:
-        """Store data in cache."""
+        """Store data in cache, evicting the least recently used entry when full."""
         self._cache[key] = CacheEntry(data=data, timestamp=time.time())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.CACHE_MAX_ENTRIES:
+            evicted, _ = self._cache.popitem(last=False)
+            self._indexes.pop(evicted, None)
 
     def clear_cache(self) -> None:
         """Clear all cached data."""
         self._cache.clear()
+        self._indexes.clear()
 
 
 # Helper functions for common use cases
@@ -0,0 +1,138 @@
+"""Retry with exponential backoff for transient Azure API failures.
+
+ARM and Microsoft Graph throttle with 429 and occasionally answer 502/503/504
+while a backend recovers. Rather than failing the whole command on such a blip,
+requests are retried with capped exponential backoff plus jitter, honoring the
+Retry-After header when the service provides one.
+
+Reference:
+- https://learn.microsoft.com/en-us/azure/architecture/best-practices/retry-service-specific
+"""
+
+import random
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# HTTP statuses that indicate throttling or a transient gateway/service problem
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+# A 502/504 gateway error may hide a request the backend already processed, so
+# non-idempotent requests are retried only when the service refused them outright:
+# throttled (429), or unavailable with an explicit Retry-After (503).
+THROTTLED_STATUS_CODE = 429
+UNAVAILABLE_STATUS_CODE = 503
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_CAP = 30.0
+DEFAULT_JITTER = 0.5
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = DEFAULT_BACKOFF_BASE,
+    cap: float = DEFAULT_BACKOFF_CAP,
+    jitter: float = DEFAULT_JITTER,
+) -> float:
+    """
+    Compute the delay before the next retry.
+
+    Args:
+        attempt: Zero-based retry attempt
+        base: Delay for the first retry in seconds
+        cap: Maximum delay before jitter in seconds
+        jitter: Maximum fraction of the delay added at random
+
+    Returns:
+        Delay in seconds
+    """
+    return min(cap, base * 2.0**attempt) * (1 + random.random() * jitter)
+
+
+def retry_after_seconds(response: requests.Response) -> float | None:
+    """
+    Parse the Retry-After header of a response.
+
+    Args:
+        response: HTTP response
+
+    Returns:
+        Seconds to wait, or None if the header is absent or invalid
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def send_with_retry(
+    send: Callable[[], requests.Response],
+    idempotent: bool = True,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    base: float = DEFAULT_BACKOFF_BASE,
+    cap: float = DEFAULT_BACKOFF_CAP,
+    jitter: float = DEFAULT_JITTER,
+) -> requests.Response:
+    """
+    Call send(), retrying throttled and transient failures.
+
+    For idempotent requests, responses with a status in RETRYABLE_STATUS_CODES and
+    timeouts/connection errors are retried. A non-idempotent request (e.g. a POST
+    that creates an activation) may already have been processed when the gateway
+    gives up, so it is only retried on 429, or on 503 with a Retry-After header.
+    Any other response (including 400/401/403) is returned immediately.
+
+    Args:
+        send: Function performing a single HTTP request
+        idempotent: Whether the request can safely be sent more than once
+        max_retries: Maximum number of retries after the first attempt
+        base: Delay for the first retry in seconds
+        cap: Maximum backoff delay in seconds
+        jitter: Maximum fraction of the delay added at random
+
+    Returns:
+        The first non-retryable response, or the last response once retries run out
+
+    Raises:
+        requests.exceptions.RequestException: If the last attempt fails at the transport level
+    """
+    attempt = 0
+    while True:
+        try:
+            response = send()
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if not idempotent or attempt >= max_retries:
+                raise
+            delay = backoff_delay(attempt, base, cap, jitter)
+        else:
+            retry_after = retry_after_seconds(response)
+            if idempotent:
+                retryable = response.status_code in RETRYABLE_STATUS_CODES
+            else:
+                retryable = response.status_code == THROTTLED_STATUS_CODE or (
+                    response.status_code == UNAVAILABLE_STATUS_CODE and retry_after is not None
+                )
+            if not retryable or attempt >= max_retries:
+                return response
+            if retry_after is None:
+                delay = backoff_delay(attempt, base, cap, jitter)
+            else:
+                delay = min(retry_after, cap)
+
+        time.sleep(delay)
+        attempt += 1
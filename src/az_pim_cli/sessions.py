@@ -0,0 +1,53 @@
+"""Per-thread HTTP sessions for the Azure API clients.
+
+requests.Session is not documented as thread-safe, yet the clients issue requests
+from several threads: pages are prefetched on a background executor and
+multi-scope listings fan out over a thread pool. ThreadLocalSession gives every
+thread its own session, so each thread still reuses its TCP/TLS connections
+without sharing a connection pool or cookie jar across threads.
+"""
+
+import threading
+
+import requests
+
+
+class ThreadLocalSession:
+    """One requests.Session per thread, all closed together by close()."""
+
+    def __init__(self, headers: dict[str, str] | None = None) -> None:
+        """
+        Initialize the session holder.
+
+        Args:
+            headers: Default headers set on every session created
+        """
+        self._headers = dict(headers or {})
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions: list[requests.Session] = []
+
+    def get(self) -> requests.Session:
+        """
+        Get the calling thread's session, creating it on first use.
+
+        Returns:
+            Session owned by the current thread
+        """
+        session: requests.Session | None = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self._headers)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self) -> None:
+        """Close the sessions of all threads and their pooled connections."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        # Threads that call get() again start with a fresh session
+        self._local = threading.local()
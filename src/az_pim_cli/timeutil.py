@@ -0,0 +1,14 @@
+"""Timestamp helpers shared by the Azure API clients."""
+
+from datetime import datetime, timezone
+
+
+def utcnow_iso_z() -> str:
+    """
+    Return the current UTC time for PIM schedule requests.
+
+    Returns:
+        Second-precision ISO 8601 timestamp with a Z suffix
+        (e.g. "2024-01-01T12:00:00Z")
+    """
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -1,7 +1,10 @@
 """Tests for authentication and IPv4 context."""
 
-import os
+import base64
+import json
 import socket
+import time
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -13,6 +16,43 @@ from az_pim_cli.auth import (
     ipv4_only_context,
     should_use_ipv4_only,
 )
+from az_pim_cli.auth.azurecli import TOKEN_REFRESH_SKEW_SECONDS, _decode_jwt_claims
+from az_pim_cli.domain.exceptions import AuthenticationError
+
+
+def _encode_jwt(payload):
+    """Build an unsigned JWT-shaped token (header.payload.signature) from a claims dict."""
+    payload_b64 = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+    return f"header.{payload_b64.rstrip('=')}.signature"
+
+
+@pytest.fixture
+def make_jwt():
+    """Return the JWT builder, for tests whose claims depend on the current time."""
+    return _encode_jwt
+
+
+@pytest.fixture(scope="module")
+def jwt_tokens():
+    """Pre-encoded tokens for the fixed claim sets used by the claim tests."""
+    return {
+        "both": _encode_jwt({"oid": "user-123", "tid": "tenant-456"}),
+        "oid_only": _encode_jwt({"oid": "user-object-123"}),
+        "tid_only": _encode_jwt({"tid": "tenant-456"}),
+    }
+
+
+@pytest.fixture(scope="module")
+def _shared_auth():
+    """One AzureAuth instance for the whole module."""
+    return AzureAuth()
+
+
+@pytest.fixture
+def auth(_shared_auth):
+    """Shared AzureAuth instance, with its token and object ID caches cleared after each test."""
+    yield _shared_auth
+    _shared_auth.invalidate_token()
 
 
 class TestAuthModuleImports:
@@ -34,66 +74,76 @@ class TestAuthModuleImports:
         assert should_use_ipv4_only is not None
 
 
-def test_should_use_ipv4_only_default():
+def test_should_use_ipv4_only_default(monkeypatch):
     """Test IPv4-only detection with default (disabled)."""
-    # Clear env var
-    os.environ.pop("AZ_PIM_IPV4_ONLY", None)
+    monkeypatch.delenv("AZ_PIM_IPV4_ONLY", raising=False)
     assert should_use_ipv4_only() is False
 
 
-def test_should_use_ipv4_only_enabled():
+@pytest.mark.parametrize("value", ["1", "true", "True", "TRUE", "yes", "Yes", "YES"])
+def test_should_use_ipv4_only_enabled(monkeypatch, value):
     """Test IPv4-only detection when enabled."""
-    test_values = ["1", "true", "True", "TRUE", "yes", "Yes", "YES"]
-    for value in test_values:
-        os.environ["AZ_PIM_IPV4_ONLY"] = value
-        assert should_use_ipv4_only() is True, f"Failed for value: {value}"
-
-    # Clean up
-    os.environ.pop("AZ_PIM_IPV4_ONLY", None)
+    monkeypatch.setenv("AZ_PIM_IPV4_ONLY", value)
+    assert should_use_ipv4_only() is True
 
 
-def test_should_use_ipv4_only_disabled():
+@pytest.mark.parametrize("value", ["0", "false", "False", "no", "No", ""])
+def test_should_use_ipv4_only_disabled(monkeypatch, value):
     """Test IPv4-only detection when explicitly disabled."""
-    test_values = ["0", "false", "False", "no", "No", ""]
-    for value in test_values:
-        os.environ["AZ_PIM_IPV4_ONLY"] = value
-        assert should_use_ipv4_only() is False, f"Failed for value: {value}"
+    monkeypatch.setenv("AZ_PIM_IPV4_ONLY", value)
+    assert should_use_ipv4_only() is False
+
+
+def test_ipv4_only_context(monkeypatch):
+    """Test that IPv4-only mode applies inside the context without swapping getaddrinfo."""
+    resolver = MagicMock(return_value=[])
+    monkeypatch.setattr("az_pim_cli.auth.azurecli._original_getaddrinfo", resolver)
+    router = socket.getaddrinfo
 
-    # Clean up
-    os.environ.pop("AZ_PIM_IPV4_ONLY", None)
+    socket.getaddrinfo("example.com", 443)
+    with ipv4_only_context():
+        assert socket.getaddrinfo is router
+        socket.getaddrinfo("example.com", 443)
+    socket.getaddrinfo("example.com", 443)
 
+    assert socket.getaddrinfo is router
+    families = [call.args[2] for call in resolver.call_args_list]
+    assert families == [0, socket.AF_INET, 0]
 
-def test_ipv4_only_context():
-    """Test IPv4-only context manager."""
-    original_getaddrinfo = socket.getaddrinfo
 
-    # Before context
-    assert socket.getaddrinfo is original_getaddrinfo
+def test_ipv4_only_context_skips_lookup_for_ipv4_literal(monkeypatch):
+    """Test that IPv4 literals are answered without calling the real resolver."""
+    resolver = MagicMock(side_effect=AssertionError("resolver called"))
+    monkeypatch.setattr("az_pim_cli.auth.azurecli._original_getaddrinfo", resolver)
 
-    # Inside context
     with ipv4_only_context():
-        assert socket.getaddrinfo is not original_getaddrinfo
-        # Test that it forces IPv4
-        # We can't easily test the actual behavior without network calls,
-        # but we can verify the function was replaced
+        result = socket.getaddrinfo("127.0.0.1", 443, type=socket.SOCK_STREAM)
 
-    # After context (should be restored)
-    assert socket.getaddrinfo is original_getaddrinfo
+    assert result == [(socket.AF_INET, socket.SOCK_STREAM, 0, "", ("127.0.0.1", 443))]
+    resolver.assert_not_called()
 
 
-def test_ipv4_only_context_exception_handling():
-    """Test that IPv4 context restores socket.getaddrinfo even on exception."""
-    original_getaddrinfo = socket.getaddrinfo
+def test_ipv4_only_context_resolves_hostnames_as_ipv4(monkeypatch):
+    """Test that hostnames still go through the resolver, restricted to IPv4."""
+    resolver = MagicMock(return_value=[])
+    monkeypatch.setattr("az_pim_cli.auth.azurecli._original_getaddrinfo", resolver)
 
-    try:
-        with ipv4_only_context():
-            assert socket.getaddrinfo is not original_getaddrinfo
-            raise ValueError("Test exception")
-    except ValueError:
-        pass
+    with ipv4_only_context():
+        socket.getaddrinfo("login.microsoftonline.com", "https")
+
+    resolver.assert_called_once_with("login.microsoftonline.com", "https", socket.AF_INET, 0, 0, 0)
+
+
+def test_ipv4_only_context_exception_handling(monkeypatch):
+    """Test that IPv4-only mode is switched off again even on exception."""
+    resolver = MagicMock(return_value=[])
+    monkeypatch.setattr("az_pim_cli.auth.azurecli._original_getaddrinfo", resolver)
+
+    with pytest.raises(ValueError), ipv4_only_context():
+        raise ValueError("Test exception")
 
-    # Should be restored even after exception
-    assert socket.getaddrinfo is original_getaddrinfo
+    socket.getaddrinfo("example.com", 443)
+    assert resolver.call_args.args[2] == 0
 
 
 def test_azure_auth_initialization():
@@ -107,17 +157,106 @@ def test_azure_auth_initialization():
 @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
 def test_azure_auth_get_token_with_cli_credential(mock_cli_cred_class):
     """Test token acquisition with AzureCliCredential."""
+    scopes = []
+    mock_token = SimpleNamespace(token="test-token-value")
+    mock_cli_cred_class.return_value = SimpleNamespace(
+        get_token=lambda scope: scopes.append(scope) or mock_token
+    )
+
+    auth = AzureAuth()
+    token = auth.get_token()
+
+    assert token == "test-token-value"
+    assert scopes[-1] == "https://graph.microsoft.com/.default"
+
+
+@patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+def test_azure_auth_reuses_cached_token(mock_cli_cred_class):
+    """Test that an unexpired token is served from the cache."""
     mock_token = MagicMock()
-    mock_token.token = "test-token-value"
+    mock_token.token = "cached-token"
+    mock_token.expires_on = time.time() + 3600
     mock_cred = MagicMock()
     mock_cred.get_token.return_value = mock_token
     mock_cli_cred_class.return_value = mock_cred
 
     auth = AzureAuth()
-    token = auth.get_token()
+    assert auth.get_token() == "cached-token"
+    calls = mock_cred.get_token.call_count
 
-    assert token == "test-token-value"
-    mock_cred.get_token.assert_called()
+    assert auth.get_token() == "cached-token"
+    assert mock_cred.get_token.call_count == calls
+
+
+@patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+def test_azure_auth_caches_token(mock_cli_cred_class):
+    """Test that tokens are cached per scope until within the refresh skew of expiry."""
+    mock_token = MagicMock()
+    mock_token.token = "scoped-token"
+    mock_token.expires_on = time.time() + TOKEN_REFRESH_SKEW_SECONDS + 60
+    mock_cred = MagicMock()
+    mock_cred.get_token.return_value = mock_token
+    mock_cli_cred_class.return_value = mock_cred
+
+    auth = AzureAuth()
+    auth.get_token("https://management.azure.com/.default")
+    calls = mock_cred.get_token.call_count
+    auth.get_token("https://management.azure.com/.default")
+    assert mock_cred.get_token.call_count == calls
+
+    # A different scope gets its own token
+    auth.get_token("https://graph.microsoft.com/.default")
+    assert mock_cred.get_token.call_count > calls
+
+    # Inside the skew window the token is fetched again
+    mock_token.expires_on = time.time() + TOKEN_REFRESH_SKEW_SECONDS - 60
+    auth.invalidate_token()
+    auth.get_token()
+    calls = mock_cred.get_token.call_count
+    auth.get_token()
+    assert mock_cred.get_token.call_count > calls
+
+
+@patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+def test_azure_auth_refreshes_expiring_token(mock_cli_cred_class):
+    """Test that tokens close to expiry, or invalidated, are fetched again."""
+    mock_token = MagicMock()
+    mock_token.token = "short-lived-token"
+    mock_token.expires_on = time.time() + 10
+    mock_cred = MagicMock()
+    mock_cred.get_token.return_value = mock_token
+    mock_cli_cred_class.return_value = mock_cred
+
+    auth = AzureAuth()
+    auth.get_token()
+    calls = mock_cred.get_token.call_count
+    auth.get_token()
+    assert mock_cred.get_token.call_count > calls
+
+    mock_token.expires_on = time.time() + 3600
+    auth.get_token()
+    auth.invalidate_token("https://graph.microsoft.com/.default")
+    calls = mock_cred.get_token.call_count
+    auth.get_token()
+    assert mock_cred.get_token.call_count > calls
+
+
+@patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+def test_azure_auth_caches_token_using_jwt_exp(mock_cli_cred_class, make_jwt):
+    """Test that the JWT exp claim is used when the credential reports no expiry."""
+    jwt = make_jwt({"exp": int(time.time()) + 3600})
+    mock_token = MagicMock(spec=["token"])
+    mock_token.token = jwt
+    mock_cred = MagicMock()
+    mock_cred.get_token.return_value = mock_token
+    mock_cli_cred_class.return_value = mock_cred
+
+    auth = AzureAuth()
+    assert auth.get_token() == jwt
+    calls = mock_cred.get_token.call_count
+
+    assert auth.get_token() == jwt
+    assert mock_cred.get_token.call_count == calls
 
 
 @patch("az_pim_cli.auth.azurecli.DefaultAzureCredential")
@@ -128,88 +267,89 @@ def test_azure_auth_fallback_to_default_credential(mock_cli_cred_class, mock_def
     mock_cli_cred_class.side_effect = Exception("CLI not available")
 
     # DefaultAzureCredential succeeds
-    mock_token = MagicMock()
-    mock_token.token = "test-token-value"
-    mock_default_cred = MagicMock()
-    mock_default_cred.get_token.return_value = mock_token
-    mock_default_cred_class.return_value = mock_default_cred
+    scopes = []
+    mock_token = SimpleNamespace(token="test-token-value")
+    mock_default_cred_class.return_value = SimpleNamespace(
+        get_token=lambda scope: scopes.append(scope) or mock_token
+    )
 
     auth = AzureAuth()
     token = auth.get_token()
 
     assert token == "test-token-value"
-    mock_default_cred.get_token.assert_called()
-
+    assert scopes[-1] == "https://graph.microsoft.com/.default"
 
-def test_extract_token_claim_from_jwt():
-    """Test extracting claims from JWT token."""
-    # Create a mock token with JWT structure
-    # JWT format: header.payload.signature
-    # Payload: {"oid": "user-123", "tid": "tenant-456"}
-    import base64
-    import json
 
-    payload = {"oid": "user-123", "tid": "tenant-456"}
-    payload_json = json.dumps(payload).encode()
-    payload_b64 = base64.urlsafe_b64encode(payload_json).decode().rstrip("=")
-    mock_token = f"header.{payload_b64}.signature"
+@patch("az_pim_cli.auth.azurecli.DefaultAzureCredential")
+@patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+def test_azure_auth_remembers_selected_credential(mock_cli_cred_class, mock_default_cred_class):
+    """Test that the credential chain is probed once, not before every token request."""
+    mock_cli_cred_class.side_effect = Exception("CLI not available")
+    mock_token = MagicMock()
+    mock_token.token = "test-token-value"
+    mock_default_cred = MagicMock()
+    mock_default_cred.get_token.return_value = mock_token
+    mock_default_cred_class.return_value = mock_default_cred
 
-    # Mock get_token to return our test token
     auth = AzureAuth()
-    with patch.object(auth, "get_token", return_value=mock_token):
-        oid = auth._extract_token_claim("https://graph.microsoft.com/.default", "oid")
-        tid = auth._extract_token_claim("https://management.azure.com/.default", "tid")
+    auth.get_token()
+    probe_and_fetch = mock_default_cred.get_token.call_count
+    auth.invalidate_token()
+    auth.get_token()
+
+    assert mock_cli_cred_class.call_count == 1
+    assert mock_default_cred.get_token.call_count == probe_and_fetch + 1
+
+
+@pytest.mark.parametrize(
+    ("scope", "claim", "expected"),
+    [
+        ("https://graph.microsoft.com/.default", "oid", "user-123"),
+        ("https://management.azure.com/.default", "tid", "tenant-456"),
+        ("https://graph.microsoft.com/.default", "missing", None),
+    ],
+)
+def test_extract_token_claim(auth, jwt_tokens, scope, claim, expected):
+    """Test extracting present and missing claims from a JWT token."""
+    with patch.object(auth, "get_token", return_value=jwt_tokens["both"]):
+        assert auth._extract_token_claim(scope, claim) == expected
 
-        assert oid == "user-123"
-        assert tid == "tenant-456"
 
+def test_get_user_object_id_from_token(auth, jwt_tokens):
+    """Test getting user object ID from token."""
+    with patch.object(auth, "get_token", return_value=jwt_tokens["oid_only"]):
+        assert auth.get_user_object_id() == "user-object-123"
 
-def test_extract_token_claim_missing_claim():
-    """Test extracting a claim that doesn't exist."""
-    import base64
-    import json
 
-    payload = {"oid": "user-123"}
-    payload_json = json.dumps(payload).encode()
-    payload_b64 = base64.urlsafe_b64encode(payload_json).decode().rstrip("=")
-    mock_token = f"header.{payload_b64}.signature"
+def test_get_user_object_id_is_cached(auth, jwt_tokens):
+    """Test that the user object ID is resolved once until tokens are invalidated."""
+    with patch.object(auth, "get_token", return_value=jwt_tokens["oid_only"]) as mock_get_token:
+        assert auth.get_user_object_id() == "user-object-123"
+        assert auth.get_user_object_id() == "user-object-123"
+        assert mock_get_token.call_count == 1
 
-    auth = AzureAuth()
-    with patch.object(auth, "get_token", return_value=mock_token):
-        result = auth._extract_token_claim("https://graph.microsoft.com/.default", "missing")
-        assert result is None
+        auth.invalidate_token()
+        assert auth.get_user_object_id() == "user-object-123"
+        assert mock_get_token.call_count == 2
 
 
-def test_get_user_object_id_from_token():
-    """Test getting user object ID from token."""
-    import base64
-    import json
-
-    payload = {"oid": "user-object-123"}
-    payload_json = json.dumps(payload).encode()
-    payload_b64 = base64.urlsafe_b64encode(payload_json).decode().rstrip("=")
-    mock_token = f"header.{payload_b64}.signature"
+def test_token_claims_decoded_once_per_token(auth, jwt_tokens):
+    """Test that reading several claims from one token decodes its payload once."""
+    _decode_jwt_claims.cache_clear()
+    with (
+        patch.object(auth, "get_token", return_value=jwt_tokens["both"]),
+        patch("az_pim_cli.auth.azurecli.loads_json", wraps=json.loads) as mock_loads,
+    ):
+        assert auth.get_user_object_id() == "user-123"
+        assert auth.get_tenant_id() == "tenant-456"
 
-    auth = AzureAuth()
-    with patch.object(auth, "get_token", return_value=mock_token):
-        oid = auth.get_user_object_id()
-        assert oid == "user-object-123"
+    mock_loads.assert_called_once()
 
 
-def test_get_tenant_id_from_token():
+def test_get_tenant_id_from_token(auth, jwt_tokens):
     """Test getting tenant ID from token."""
-    import base64
-    import json
-
-    payload = {"tid": "tenant-456"}
-    payload_json = json.dumps(payload).encode()
-    payload_b64 = base64.urlsafe_b64encode(payload_json).decode().rstrip("=")
-    mock_token = f"header.{payload_b64}.signature"
-
-    auth = AzureAuth()
-    with patch.object(auth, "get_token", return_value=mock_token):
-        tid = auth.get_tenant_id()
-        assert tid == "tenant-456"
+    with patch.object(auth, "get_token", return_value=jwt_tokens["tid_only"]):
+        assert auth.get_tenant_id() == "tenant-456"
 
 
 @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
@@ -243,7 +383,5 @@ def test_azure_auth_get_user_object_id_error(mock_cli_cred):
 
     auth = AzureAuth()
 
-    from az_pim_cli.domain.exceptions import AuthenticationError
-
     with pytest.raises(AuthenticationError):
         auth.get_user_object_id()
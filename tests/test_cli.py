@@ -1,368 +1,255 @@
 """Tests for CLI commands."""
 
+import re
+from functools import partial
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from typer.main import get_command
 from typer.testing import CliRunner
 
+import az_pim_cli.cli as cli
+from az_pim_cli import __version__, output
+from az_pim_cli.auth import AzureAuth
 from az_pim_cli.cli import app
+from az_pim_cli.config import Config
+from az_pim_cli.domain.models import NormalizedRole, RoleSource
+from az_pim_cli.exceptions import AuthenticationError
+from az_pim_cli.pim_client import PIMClient
 
 runner = CliRunner()
 
+# Rich styles output when color is forced (e.g. FORCE_COLOR); assertions match plain text
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
 
-def test_version_command() -> None:
-    """Test version command."""
-    result = runner.invoke(app, ["version"])
-    assert result.exit_code == 0
-    assert "az-pim-cli" in result.stdout
-    assert "0.1.0" in result.stdout
-
-
-def test_whoami_command(monkeypatch) -> None:
-    """Test whoami command."""
-    import az_pim_cli.cli as cli
-
-    class FakeAuth:
-        def get_tenant_id(self) -> str:
-            return "test-tenant-id"
-
-        def get_user_object_id(self) -> str:
-            return "test-user-id"
-
-        def get_subscription_id(self) -> str:
-            return "test-subscription-id"
-
-        def get_token(self, scope: str) -> str:
-            return "fake-token"
-
-    monkeypatch.setattr(cli, "AzureAuth", FakeAuth)
-
-    result = runner.invoke(app, ["whoami"])
-    assert result.exit_code == 0
-    assert "test-tenant-id" in result.stdout
-    assert "test-user-id" in result.stdout
-    assert "test-subscription-id" in result.stdout
-
-
-def test_whoami_command_verbose(monkeypatch) -> None:
-    """Test whoami command with verbose flag."""
-    import az_pim_cli.cli as cli
-
-    class FakeAuth:
-        def get_tenant_id(self) -> str:
-            return "test-tenant-id"
-
-        def get_user_object_id(self) -> str:
-            return "test-user-id"
-
-        def get_subscription_id(self) -> str:
-            return "test-subscription-id"
-
-        def get_token(self, scope: str) -> str:
-            return "fake-token"
-
-    monkeypatch.setattr(cli, "AzureAuth", FakeAuth)
-
-    result = runner.invoke(app, ["whoami", "--verbose"])
-    assert result.exit_code == 0
-    assert "test-tenant-id" in result.stdout
-    assert "Token Validation" in result.stdout or "token available" in result.stdout
-
-
-def test_whoami_command_auth_error(monkeypatch) -> None:
-    """Test whoami command with authentication initialization error."""
-    import az_pim_cli.cli as cli
-    from az_pim_cli.exceptions import AuthenticationError
 
-    class FakeAuth:
-        def __init__(self):
-            raise AuthenticationError("Auth failed", suggestion="Run az login")
+def _plain(text: str) -> str:
+    """Strip ANSI escape sequences from captured output."""
+    return _ANSI_RE.sub("", text)
 
-    monkeypatch.setattr(cli, "AzureAuth", FakeAuth)
 
-    result = runner.invoke(app, ["whoami"])
-    assert result.exit_code == 1
-    assert "Authentication failed" in result.stdout
+@pytest.fixture(autouse=True)
+def _plain_wide_terminal(monkeypatch):
+    """Render CLI output uncolored and wide, so wrapping can't split asserted text."""
+    for name, value in {"NO_COLOR": "1", "TERM": "dumb", "COLUMNS": "200"}.items():
+        monkeypatch.setenv(name, value)
+    # Module-level consoles read the environment at import, so widen them directly
+    monkeypatch.setattr(cli.console, "width", 200)
+    monkeypatch.setattr(output.console, "width", 200)
 
 
-def test_whoami_command_partial_failure(monkeypatch) -> None:
-    """Test whoami command with partial failures."""
-    import az_pim_cli.cli as cli
+@pytest.fixture(scope="session")
+def make_fake_auth():
+    """
+    Build AzureAuth mocks that enforce the real interface.
 
-    class FakeAuth:
-        def get_tenant_id(self) -> str:
-            return "test-tenant-id"
+    Keyword arguments override a method's return value, or its side effect
+    when given an exception.
+    """
+    defaults = {
+        "get_tenant_id": "test-tenant-id",
+        "get_user_object_id": "test-user-id",
+        "get_subscription_id": "test-subscription-id",
+        "get_token": "fake-token",
+    }
 
-        def get_user_object_id(self) -> str:
-            return "test-user-id"
+    def _make(**overrides):
+        auth = MagicMock(spec=AzureAuth)
+        for name, value in {**defaults, **overrides}.items():
+            if isinstance(value, BaseException):
+                getattr(auth, name).side_effect = value
+            else:
+                getattr(auth, name).return_value = value
+        return auth
 
-        def get_subscription_id(self) -> str:
-            raise RuntimeError("No subscription")
+    return _make
 
-        def get_token(self, scope: str) -> str:
-            return "fake-token"
 
-    monkeypatch.setattr(cli, "AzureAuth", FakeAuth)
+def test_version_command(capsys) -> None:
+    """Test version command."""
+    cli.version()
+    output = _plain(capsys.readouterr().out)
+    assert "az-pim-cli" in output
+    assert __version__ in output
+
+
+@pytest.mark.parametrize(
+    ("args", "auth_overrides", "exit_code", "expected"),
+    [
+        (
+            ["whoami"],
+            {},
+            0,
+            [("test-tenant-id",), ("test-user-id",), ("test-subscription-id",)],
+        ),
+        (
+            ["whoami", "--verbose"],
+            {},
+            0,
+            [("test-tenant-id",), ("Token Validation", "token available")],
+        ),
+        (
+            ["whoami"],
+            {"get_subscription_id": RuntimeError("No subscription")},
+            0,
+            [("test-tenant-id",), ("test-user-id",), ("Not available", "No subscription")],
+        ),
+    ],
+    ids=["default", "verbose", "partial-failure"],
+)
+def test_whoami_command(
+    make_fake_auth,
+    monkeypatch,
+    args: list[str],
+    auth_overrides: dict,
+    exit_code: int,
+    expected: list[tuple[str, ...]],
+) -> None:
+    """Test whoami output, including partial failures to read identity details."""
+    monkeypatch.setattr(cli, "AzureAuth", partial(make_fake_auth, **auth_overrides))
+
+    result = runner.invoke(app, args)
+    assert result.exit_code == exit_code
+    output = _plain(result.stdout)
+    # Each entry lists interchangeable substrings, any one of which must appear
+    for alternatives in expected:
+        assert any(text in output for text in alternatives)
+
+
+def test_whoami_command_auth_error(monkeypatch, capsys) -> None:
+    """Test whoami exits with an error when authentication cannot be set up."""
+    monkeypatch.setattr(
+        cli,
+        "AzureAuth",
+        MagicMock(side_effect=AuthenticationError("Auth failed", suggestion="Run az login")),
+    )
 
-    result = runner.invoke(app, ["whoami"])
-    assert result.exit_code == 0
-    assert "test-tenant-id" in result.stdout
-    assert "test-user-id" in result.stdout
-    assert "Not available" in result.stdout or "No subscription" in result.stdout
+    with pytest.raises(cli.typer.Exit) as exc_info:
+        cli.whoami(verbose=False)
+    assert exc_info.value.exit_code == 1
+    output = _plain(capsys.readouterr().out)
+    assert "Authentication failed" in output
+    assert "Run az login" in output
 
 
 def test_alias_list_command() -> None:
-    """Test alias list command."""
+    """Test alias list command succeeds and shows the description column."""
     result = runner.invoke(app, ["alias", "list"])
     # Should succeed even with no aliases
     assert result.exit_code == 0
-
-
-def test_help_command() -> None:
-    """Test help command."""
-    result = runner.invoke(app, ["--help"])
-    assert result.exit_code == 0
-    assert "Azure PIM CLI" in result.stdout
-
-
-def test_list_help_shows_select_option() -> None:
-    """Test that list help shows the --select option."""
-    result = runner.invoke(app, ["list", "--help"])
-    assert result.exit_code == 0
-    # Check without colors (strip ANSI codes)
-    assert "select" in result.stdout.lower()
-    assert "interactive" in result.stdout.lower() or "activate a role" in result.stdout.lower()
-
-
-def test_activate_help_shows_number_format() -> None:
-    """Test that activate help shows role number format."""
-    result = runner.invoke(app, ["activate", "--help"])
-    assert result.exit_code == 0
-    assert "number from list" in result.stdout.lower() or "#n" in result.stdout.lower()
-
-
-def test_alias_list_shows_description_column() -> None:
-    """Test that alias list command shows description column."""
-    result = runner.invoke(app, ["alias", "list"])
-    assert result.exit_code == 0
-    # Check that the Description column is present in the output
-    # (should appear even if no aliases are configured)
-    assert "Description" in result.stdout or "No aliases configured" in result.stdout
-
-
-def test_activate_alias_missing_role_non_tty(monkeypatch) -> None:
+    # The Description column should appear whenever aliases are configured
+    output = _plain(result.stdout)
+    assert "Description" in output or "No aliases configured" in output
+
+
+def _render_help(command_path: list[str], capsys) -> str:
+    """Render help for a (sub)command without going through argv parsing."""
+    command = get_command(app)
+    ctx = command.context_class(command, info_name="az-pim")
+    for name in command_path:
+        command = command.get_command(ctx, name)
+        ctx = command.context_class(command, info_name=name, parent=ctx)
+    # Rich-formatted help is printed rather than returned
+    text = command.get_help(ctx)
+    return _plain(text + capsys.readouterr().out)
+
+
+@pytest.mark.parametrize(
+    ("command_path", "expected"),
+    [
+        ([], ["azure pim cli"]),
+        (["list"], ["select", "interactive"]),
+        (["activate"], ["#n", "number from list", "--duration", "--justification"]),
+    ],
+    ids=["app", "list", "activate"],
+)
+def test_help(command_path: list[str], expected: list[str], capsys) -> None:
+    """Test that help output documents the key options."""
+    # Compare case-insensitively; help text formatting varies with the terminal
+    output = _render_help(command_path, capsys).lower()
+    for needle in expected:
+        assert needle in output
+
+
+@pytest.fixture
+def activation_env(make_fake_auth, monkeypatch):
+    """
+    Install fakes for the config, auth and PIM client used by the activate command.
+
+    The returned factory takes the config defaults and aliases, the roles that
+    list_role_assignments returns, and whether stdin counts as a TTY. It returns
+    the spec'd config and client mocks, so tests can inspect
+    client.request_role_activation calls.
+    """
+
+    def _install(*, defaults=None, aliases=None, roles=(), tty=False):
+        defaults = defaults or {}
+        aliases = aliases or {}
+
+        config = MagicMock(spec=Config)
+        config.get_alias.side_effect = aliases.get
+        config.get_default.side_effect = lambda key, fallback=None: defaults.get(key, fallback)
+        config.list_aliases.return_value = aliases
+
+        client = MagicMock(spec=PIMClient)
+        client.list_role_assignments.return_value = list(roles)
+        client.request_role_activation.return_value = {"id": "req-123"}
+
+        monkeypatch.setattr(cli, "Config", lambda: config)
+        monkeypatch.setattr(cli, "AzureAuth", partial(make_fake_auth, get_subscription_id="sub-id"))
+        monkeypatch.setattr(cli, "PIMClient", lambda *_args, **_kwargs: client)
+        monkeypatch.setattr(cli, "_is_tty", lambda: tty)
+        return SimpleNamespace(config=config, client=client)
+
+    return _install
+
+
+def test_activate_alias_missing_role_non_tty(activation_env, capsys) -> None:
     """Missing alias role errors without prompting when not a TTY."""
-    import types
-
-    import az_pim_cli.cli as cli
-
-    class FakeConfig:
-        def __init__(self) -> None:
-            pass
-
-        def get_alias(self, name: str):
-            if name == "alias-missing-role":
-                return {"scope": "directory"}
-            return None
-
-        def get_default(self, key: str):
-            return None
+    activation_env(aliases={"alias-missing-role": {"scope": "directory"}})
 
-    class FakeAuth:
-        def __init__(self) -> None:
-            pass
+    with pytest.raises(cli.typer.Exit) as exc_info:
+        cli._activate_impl("alias-missing-role")
+    assert exc_info.value.exit_code != 0
+    assert "Role name or ID is required" in _plain(capsys.readouterr().out)
 
-        def get_subscription_id(self) -> str:
-            return "sub-id"
 
-    class FakeClient:
-        def __init__(self, *_args, **_kwargs) -> None:
-            pass
-
-    monkeypatch.setattr(cli, "Config", FakeConfig)
-    monkeypatch.setattr(cli, "AzureAuth", FakeAuth)
-    monkeypatch.setattr(cli, "PIMClient", FakeClient)
-    monkeypatch.setattr(
-        cli, "sys", types.SimpleNamespace(stdin=types.SimpleNamespace(isatty=lambda: False))
-    )
-
-    result = runner.invoke(cli.app, ["activate", "alias-missing-role"])
-    assert result.exit_code != 0
-    assert "Role name or ID is required" in result.stdout
-
-
-def test_activate_prompts_defaults_when_tty(monkeypatch) -> None:
+def test_activate_prompts_defaults_when_tty(activation_env, monkeypatch) -> None:
     """TTY activation prompts for duration/justification and applies defaults."""
-    import types
-
-    import az_pim_cli.cli as cli
-
-    captured = {}
-
-    class FakeConfig:
-        def __init__(self) -> None:
-            pass
-
-        def get_alias(self, _name: str):
-            return None
-
-        def get_default(self, key: str):
-            if key == "duration":
-                return "PT4H"
-            if key == "justification":
-                return "Default just"
-            return None
-
-    class FakeAuth:
-        def __init__(self) -> None:
-            pass
-
-        def get_subscription_id(self) -> str:
-            return "sub-id"
-
-    class FakeClient:
-        def __init__(self, *_args, **_kwargs) -> None:
-            pass
-
-        def request_role_activation(
-            self,
-            role_definition_id: str,
-            duration: str,
-            justification: str,
-            ticket_number,
-            ticket_system,
-        ):
-            captured["payload"] = {
-                "role_definition_id": role_definition_id,
-                "duration": duration,
-                "justification": justification,
-                "ticket_number": ticket_number,
-                "ticket_system": ticket_system,
-            }
-            return {"id": "req-123"}
-
-    monkeypatch.setattr(cli, "Config", FakeConfig)
-    monkeypatch.setattr(cli, "AzureAuth", FakeAuth)
-    monkeypatch.setattr(cli, "PIMClient", FakeClient)
-    monkeypatch.setattr(
-        cli, "sys", types.SimpleNamespace(stdin=types.SimpleNamespace(isatty=lambda: True))
-    )
-
-    result = runner.invoke(
-        cli.app, ["activate", "62e90394-69f5-4237-9190-012177145e10"], input="\n\n"
-    )
-    assert result.exit_code == 0
-    assert captured["payload"]["duration"] == "PT4H"
-    assert captured["payload"]["justification"] == "Default just"
-
-
-def test_activate_no_role_non_tty_errors(monkeypatch) -> None:
-    """Activation without a role should error in non-interactive mode."""
-    import types
-
-    import az_pim_cli.cli as cli
-
-    class FakeConfig:
-        def __init__(self) -> None:
-            pass
-
-        def get_alias(self, _name: str):
-            return None
-
-        def get_default(self, _key: str):
-            return None
-
-        def list_aliases(self):
-            return {}
+    env = activation_env(defaults={"duration": "PT4H", "justification": "Default just"}, tty=True)
 
-    class FakeAuth:
-        def __init__(self) -> None:
-            pass
+    # Accept the default offered by each prompt, as pressing Enter would
+    monkeypatch.setattr(cli.typer, "prompt", lambda _text, default=None, **_kwargs: default)
 
-        def get_subscription_id(self) -> str:
-            return "sub-id"
+    cli._activate_impl("62e90394-69f5-4237-9190-012177145e10")
+    payload = env.client.request_role_activation.call_args.kwargs
+    assert payload["duration"] == "PT4H"
+    assert payload["justification"] == "Default just"
 
-    class FakeClient:
-        def __init__(self, *_args, **_kwargs) -> None:
-            pass
 
-        def list_role_assignments(self):
-            return []
-
-    monkeypatch.setattr(cli, "Config", FakeConfig)
-    monkeypatch.setattr(cli, "AzureAuth", FakeAuth)
-    monkeypatch.setattr(cli, "PIMClient", FakeClient)
-    monkeypatch.setattr(
-        cli,
-        "sys",
-        types.SimpleNamespace(stdin=types.SimpleNamespace(isatty=lambda: False)),
-    )
+def test_activate_no_role_non_tty_errors(activation_env) -> None:
+    """Activation without a role should error in non-interactive mode."""
+    activation_env()
 
-    result = runner.invoke(cli.app, ["activate"])
+    result = runner.invoke(app, ["activate"])
     assert result.exit_code != 0
-    assert "Role name or ID is required" in result.stdout
+    assert "Role name or ID is required" in _plain(result.stdout)
 
 
-def test_activate_no_role_interactive_search(monkeypatch) -> None:
+def test_activate_no_role_interactive_search(activation_env, monkeypatch) -> None:
     """Interactive no-arg activation searches with fuzzy support and activates."""
-    import types
-
-    import az_pim_cli.cli as cli
-    from az_pim_cli.domain.models import NormalizedRole, RoleSource
-
-    captured = {}
-
-    class FakeConfig:
-        def __init__(self) -> None:
-            pass
-
-        def get_alias(self, _name: str):
-            return None
-
-        def get_default(self, key: str, fallback=None):
-            if key == "duration":
-                return "PT1H"
-            if key == "justification":
-                return "Default just"
-            # Support resolver config
-            if key == "fuzzy_matching":
-                return True
-            if key == "fuzzy_threshold":
-                return 0.8
-            if key == "cache_ttl_seconds":
-                return 300
-            return fallback if fallback is not None else None
-
-        def list_aliases(self):
-            return {}
-
-    class FakeAuth:
-        def __init__(self) -> None:
-            pass
-
-        def get_subscription_id(self) -> str:
-            return "sub-id"
-
-    class FakeClient:
-        def __init__(self, *_args, **_kwargs) -> None:
-            pass
-
-        def list_role_assignments(self):
-            return ["dummy"]
-
-        def request_role_activation(
-            self,
-            role_definition_id: str,
-            duration: str,
-            justification: str,
-            ticket_number,
-            ticket_system,
-        ):
-            captured["payload"] = {
-                "role_definition_id": role_definition_id,
-                "duration": duration,
-                "justification": justification,
-                "ticket_number": ticket_number,
-                "ticket_system": ticket_system,
-            }
-            return {"id": "req-xyz"}
+    env = activation_env(
+        defaults={
+            "duration": "PT1H",
+            "justification": "Default just",
+            "fuzzy_matching": True,
+            "fuzzy_threshold": 0.8,
+            "cache_ttl_seconds": 300,
+        },
+        roles=["dummy"],
+        tty=True,
+    )
 
     def fake_normalize(_data, source=None) -> list[NormalizedRole]:
         return [
@@ -376,21 +263,11 @@ def test_activate_no_role_interactive_search(monkeypatch) -> None:
             )
         ]
 
-    monkeypatch.setattr(cli, "Config", FakeConfig)
-    monkeypatch.setattr(cli, "AzureAuth", FakeAuth)
-    monkeypatch.setattr(cli, "PIMClient", FakeClient)
     monkeypatch.setattr(cli, "normalize_roles", fake_normalize)
-    monkeypatch.setattr(
-        cli,
-        "sys",
-        types.SimpleNamespace(
-            stdin=types.SimpleNamespace(isatty=lambda: True),
-            stdout=types.SimpleNamespace(isatty=lambda: True),
-        ),
-    )
 
-    result = runner.invoke(cli.app, ["activate"], input="Owner\n1\n\n\n")
+    result = runner.invoke(app, ["activate"], input="Owner\n1\n\n\n")
     assert result.exit_code == 0
-    assert captured["payload"]["role_definition_id"] == "role-id"
-    assert captured["payload"]["duration"] == "PT1H"
-    assert captured["payload"]["justification"] == "Default just"
+    payload = env.client.request_role_activation.call_args.kwargs
+    assert payload["role_definition_id"] == "role-id"
+    assert payload["duration"] == "PT1H"
+    assert payload["justification"] == "Default just"
@@ -0,0 +1,26 @@
+"""Tests for JSON decoding helpers."""
+
+import pytest
+
+from az_pim_cli import jsonutil
+
+
+@pytest.mark.parametrize("has_orjson", [True, False])
+def test_loads_json(monkeypatch, has_orjson):
+    """Bytes decode the same with and without orjson."""
+    if has_orjson and not jsonutil.HAS_ORJSON:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(jsonutil, "HAS_ORJSON", has_orjson)
+
+    assert jsonutil.loads_json(b'{"value": [{"id": "r\\u00f6le"}]}') == {"value": [{"id": "röle"}]}
+
+
+@pytest.mark.parametrize("has_orjson", [True, False])
+def test_loads_json_invalid(monkeypatch, has_orjson):
+    """Invalid JSON raises ValueError with either decoder."""
+    if has_orjson and not jsonutil.HAS_ORJSON:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(jsonutil, "HAS_ORJSON", has_orjson)
+
+    with pytest.raises(ValueError):
+        jsonutil.loads_json(b"<html>")
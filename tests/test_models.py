@@ -154,6 +154,22 @@ def test_normalize_arm_role_with_missing_fields():
     assert normalized.status == "Active"
 
 
+def test_normalize_arm_role_without_expanded_scope():
+    """Test normalizing ARM response whose expandedProperties lack a scope."""
+    arm_response = {
+        "properties": {
+            "roleDefinitionId": "role-123",
+            "expandedProperties": {"roleDefinition": {"displayName": "Reader"}},
+        }
+    }
+
+    normalized = normalize_arm_role(arm_response)
+
+    assert normalized.name == "Reader"
+    assert normalized.scope == ""
+    assert normalized.resource_name is None
+
+
 def test_normalize_graph_role_with_missing_fields():
     """Test normalizing Graph response with missing fields."""
     graph_response = {}
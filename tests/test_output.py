@@ -116,6 +116,18 @@ class TestCreateRolesTable:
         table = create_roles_table(show_status=False)
         assert isinstance(table, Table)
 
+    def test_create_roles_table_columns(self):
+        """Test that optional columns are placed between name and role ID."""
+        table = create_roles_table(show_scope=True)
+        headers = [column.header for column in table.columns]
+        assert headers == ["#", "Role Name", "Status", "Scope", "Role ID"]
+
+    def test_create_roles_tables_do_not_share_columns(self):
+        """Test that each call returns a table with its own column objects."""
+        first = create_roles_table()
+        second = create_roles_table()
+        assert first.columns[0] is not second.columns[0]
+
 
 class TestCreateHistoryTable:
     """Tests for create_history_table function."""
@@ -0,0 +1,93 @@
+"""Tests for shared nextLink pagination."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from az_pim_cli.exceptions import ParsingError
+from az_pim_cli.pagination import paginate
+
+PREFIX = "https://management.azure.com/"
+FIRST = f"{PREFIX}items"
+NEXT = f"{PREFIX}items?$skiptoken=2"
+
+
+def make_fetch(pages):
+    """Return a fetch callable serving pages by URL and the list of requests made."""
+    requested = []
+
+    def fetch(url, params):
+        requested.append((url, params))
+        return pages[url]
+
+    return fetch, requested
+
+
+def test_follows_next_link_without_executor():
+    """Pages are fetched lazily, and only the first page gets query parameters."""
+    fetch, requested = make_fetch(
+        {FIRST: {"value": [1, 2], "nextLink": NEXT}, NEXT: {"value": [3]}}
+    )
+
+    items = paginate(fetch, FIRST, {"$top": "2"}, operation="list", allowed_prefixes=PREFIX)
+
+    assert next(items) == 1
+    assert requested == [(FIRST, {"$top": "2"})]
+    assert list(items) == [2, 3]
+    assert requested[1] == (NEXT, None)
+
+
+def test_prefetches_on_executor():
+    """With an executor, every page is still yielded in order."""
+    fetch, requested = make_fetch(
+        {FIRST: {"value": [1], "@odata.nextLink": NEXT}, NEXT: {"value": [2]}}
+    )
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        items = list(
+            paginate(
+                fetch, FIRST, None, operation="list", allowed_prefixes=PREFIX, executor=executor
+            )
+        )
+
+    assert items == [1, 2]
+    assert [url for url, _ in requested] == [FIRST, NEXT]
+
+
+def test_rejects_foreign_first_url():
+    """The first URL is checked against the allowed prefixes before any request."""
+    fetch, requested = make_fetch({})
+
+    with pytest.raises(ParsingError):
+        list(
+            paginate(
+                fetch,
+                "https://attacker.example/items",
+                None,
+                operation="list",
+                allowed_prefixes=PREFIX,
+            )
+        )
+
+    assert requested == []
+
+
+def test_limit_skips_prefetch():
+    """No next page is requested when the current page satisfies the limit."""
+    fetch, requested = make_fetch({FIRST: {"value": [1, 2, 3], "nextLink": NEXT}})
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        items = list(
+            paginate(
+                fetch,
+                FIRST,
+                None,
+                operation="list",
+                allowed_prefixes=PREFIX,
+                limit=3,
+                executor=executor,
+            )
+        )
+
+    assert items == [1, 2, 3]
+    assert requested == [(FIRST, None)]
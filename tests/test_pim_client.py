@@ -0,0 +1,164 @@
+"""Tests for the PIM API client."""
+
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from az_pim_cli.exceptions import NetworkError, ParsingError
+from az_pim_cli.pim_client import PIMClient
+
+GRAPH_FIRST = "https://graph.microsoft.com/beta/items"
+GRAPH_NEXT_2 = "https://graph.microsoft.com/beta/items?$skiptoken=2"
+GRAPH_NEXT_3 = "https://graph.microsoft.com/beta/items?$skiptoken=3"
+ARM_NEXT = "https://management.azure.com/items?$skiptoken=2"
+
+
+@pytest.fixture
+def client():
+    """PIMClient with a mocked auth instance."""
+    auth = MagicMock()
+    auth.get_token.return_value = "test-token"
+    auth.get_user_object_id.return_value = "user-123"
+    return PIMClient(auth=auth)
+
+
+class TestPaginate:
+    """Tests for nextLink pagination."""
+
+    def test_follows_odata_next_link(self, client, monkeypatch):
+        """Items from every page are yielded in order."""
+        pages = {
+            GRAPH_FIRST: {"value": [1, 2], "@odata.nextLink": GRAPH_NEXT_2},
+            GRAPH_NEXT_2: {"value": [3], "@odata.nextLink": GRAPH_NEXT_3},
+            GRAPH_NEXT_3: {"value": [4]},
+        }
+        monkeypatch.setattr(
+            client, "_make_request", lambda method, url, *args, **kwargs: pages[url]
+        )
+
+        assert list(client._paginate(GRAPH_FIRST, None, {})) == [1, 2, 3, 4]
+
+    def test_follows_arm_next_link(self, client, monkeypatch):
+        """ARM-style nextLink is followed as well."""
+        pages = {
+            GRAPH_FIRST: {"value": ["a"], "nextLink": ARM_NEXT},
+            ARM_NEXT: {"value": ["b"]},
+        }
+        monkeypatch.setattr(
+            client, "_make_request", lambda method, url, *args, **kwargs: pages[url]
+        )
+
+        assert list(client._paginate(GRAPH_FIRST, None, {})) == ["a", "b"]
+
+    def test_rejects_foreign_next_link(self, client, monkeypatch):
+        """A nextLink pointing at another host is never requested."""
+        requested = []
+
+        def fake_request(method, url, *args, **kwargs):
+            requested.append(url)
+            return {"value": [1], "nextLink": "https://attacker.example/page2"}
+
+        monkeypatch.setattr(client, "_make_request", fake_request)
+
+        with pytest.raises(ParsingError):
+            list(client._paginate(GRAPH_FIRST, None, {}))
+        assert requested == [GRAPH_FIRST]
+
+    def test_limit_stops_before_next_page(self, client, monkeypatch):
+        """No further page is requested once the limit is reached."""
+        requested = []
+
+        def fake_request(method, url, *args, **kwargs):
+            requested.append(url)
+            return {"value": [1, 2, 3], "nextLink": ARM_NEXT}
+
+        monkeypatch.setattr(client, "_make_request", fake_request)
+
+        assert list(client._paginate(GRAPH_FIRST, None, {}, limit=2)) == [1, 2]
+        assert requested == [GRAPH_FIRST]
+
+    def test_list_pending_approvals_returns_all_pages(self, client, monkeypatch):
+        """Pending approvals are no longer truncated to the first page."""
+        calls = []
+
+        def fake_request(method, url, headers, params=None, **kwargs):
+            calls.append((url, params))
+            if len(calls) == 1:
+                return {"value": [{"id": "req-1"}], "@odata.nextLink": GRAPH_NEXT_2}
+            return {"value": [{"id": "req-2"}]}
+
+        monkeypatch.setattr(client, "_make_request", fake_request)
+
+        results = client.list_pending_approvals()
+
+        assert [r["id"] for r in results] == ["req-1", "req-2"]
+        assert calls[1] == (GRAPH_NEXT_2, None)
+
+
+def test_context_manager_closes_session(client, monkeypatch):
+    """Leaving the context closes the pooled session."""
+    closed = []
+    monkeypatch.setattr(client._session, "close", lambda: closed.append(True))
+
+    with client as entered:
+        assert entered is client
+
+    assert closed == [True]
+
+
+def test_prefetch_executor_shared_until_close(client, monkeypatch):
+    """Paginated calls reuse one prefetch executor, which close() shuts down."""
+    pages = {
+        GRAPH_FIRST: {"value": [1], "@odata.nextLink": GRAPH_NEXT_2},
+        GRAPH_NEXT_2: {"value": [2]},
+    }
+    monkeypatch.setattr(client, "_make_request", lambda method, url, *args, **kwargs: pages[url])
+
+    assert list(client._paginate(GRAPH_FIRST, None, {})) == [1, 2]
+    executor = client._prefetch_executor
+    assert list(client._paginate(GRAPH_FIRST, None, {})) == [1, 2]
+    assert client._prefetch_executor is executor
+
+    client.close()
+
+    assert client._prefetch_executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(lambda: None)
+
+
+def test_dns_failure_suggests_ipv4(client, monkeypatch):
+    """DNS resolution failures are reported with an IPv4-only hint."""
+    monkeypatch.delenv("AZ_PIM_IPV4_ONLY", raising=False)
+    monkeypatch.setattr(
+        client._session,
+        "request",
+        MagicMock(side_effect=requests.exceptions.ConnectionError("Name or service not known")),
+    )
+    monkeypatch.setattr("az_pim_cli.retry.time.sleep", lambda delay: None)
+
+    with pytest.raises(NetworkError) as exc_info:
+        client._make_request("GET", "https://example.invalid", {})
+
+    assert exc_info.value.suggest_ipv4 is True
+
+
+def test_unsupported_method_rejected(client):
+    """Methods outside HTTP_METHODS fail before any request is sent."""
+    with pytest.raises(ValueError, match="Unsupported HTTP method"):
+        client._make_request("DELETE", "https://example.invalid", {})
+
+
+@pytest.mark.parametrize("status_code", [502, 504])
+def test_post_gateway_error_sent_once(client, monkeypatch, status_code):
+    """An activation POST that hits a gateway error is not resent."""
+    response = requests.Response()
+    response.status_code = status_code
+    request = MagicMock(return_value=response)
+    monkeypatch.setattr(client._session, "request", request)
+    monkeypatch.setattr("az_pim_cli.retry.time.sleep", lambda delay: None)
+
+    with pytest.raises(NetworkError):
+        client._make_request("POST", client.GRAPH_ASSIGNMENT_REQUESTS_URL, {}, json_data={})
+
+    request.assert_called_once()
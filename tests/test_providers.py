@@ -2,7 +2,11 @@
 
 from unittest.mock import MagicMock, patch
 
+import pytest
+import requests
+
 from az_pim_cli.auth import AzureAuth
+from az_pim_cli.exceptions import NetworkError, PermissionError
 from az_pim_cli.providers import AzureARMProvider, EntraGraphProvider
 
 
@@ -52,7 +56,139 @@ class TestEntraGraphProvider:
 
         assert "Authorization" in headers
         assert headers["Authorization"] == "Bearer test-token-value"
-        assert "Content-Type" in headers
+        assert provider._session.headers["Content-Type"] == "application/json"
+        assert provider._get_headers() is headers
+
+    @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+    def test_context_manager_closes_session(self, mock_cred):
+        """Test that leaving the context closes the pooled session."""
+        mock_cred.return_value = MagicMock()
+        provider = EntraGraphProvider(auth=AzureAuth())
+
+        with patch.object(provider._session, "close") as mock_close:
+            with provider as entered:
+                assert entered is provider
+
+        mock_close.assert_called_once()
+
+    @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+    def test_make_request_permission_error_message(self, mock_cred):
+        """Test that the Graph error message is surfaced on 403."""
+        mock_cred.return_value = MagicMock()
+        provider = EntraGraphProvider(auth=AzureAuth())
+        response = MagicMock(status_code=403, content=b'{"error": {"message": "Denied"}}')
+
+        with (
+            patch.object(provider, "_get_headers", return_value={}),
+            patch.object(provider._session, "request", return_value=response),
+            pytest.raises(PermissionError, match="Denied"),
+        ):
+            provider._make_request("GET", "https://graph.microsoft.com/beta/x")
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "getaddrinfo failed",
+            "[Errno -2] Name or service not known",
+            "[Errno -3] Temporary failure in name resolution",
+        ],
+    )
+    @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+    def test_make_request_detects_dns_failure(self, mock_cred, message, monkeypatch):
+        """Test that DNS resolution failures suggest IPv4-only mode."""
+        mock_cred.return_value = MagicMock()
+        monkeypatch.delenv("AZ_PIM_IPV4_ONLY", raising=False)
+        monkeypatch.setattr("az_pim_cli.retry.time.sleep", lambda delay: None)
+        provider = EntraGraphProvider(auth=AzureAuth())
+
+        with (
+            patch.object(provider, "_get_headers", return_value={}),
+            patch.object(
+                provider._session,
+                "request",
+                side_effect=requests.exceptions.ConnectionError(message),
+            ),
+            pytest.raises(NetworkError) as exc_info,
+        ):
+            provider._make_request("GET", "https://graph.microsoft.com/beta/x")
+
+        assert exc_info.value.suggest_ipv4 is True
+
+    @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+    def test_list_eligible_roles_passes_top(self, mock_cred):
+        """Test that a limit is sent to Graph as $top."""
+        mock_cred.return_value = MagicMock()
+        provider = EntraGraphProvider(auth=AzureAuth())
+
+        with patch.object(
+            provider, "_make_request", return_value={"value": [{"id": "r1"}] * 5}
+        ) as mock_request:
+            results = provider.list_eligible_roles(principal_id="user-123", limit=5)
+
+        assert len(results) == 5
+        mock_request.assert_called_once()
+        assert mock_request.call_args.args[2]["$top"] == "5"
+
+    @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+    def test_list_eligible_roles_requests_large_projected_pages(self, mock_cred):
+        """Test that unlimited listings use the largest page and a field projection."""
+        mock_cred.return_value = MagicMock()
+        provider = EntraGraphProvider(auth=AzureAuth())
+
+        with patch.object(provider, "_make_request", return_value={"value": []}) as mock_request:
+            provider.list_eligible_roles(principal_id="user-123")
+
+        params = mock_request.call_args.args[2]
+        assert params["$top"] == "999"
+        assert "roleDefinitionId" in params["$select"]
+        assert params["$expand"].startswith("roleDefinition($select=")
+
+    @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+    def test_list_active_assignments_follows_next_link(self, mock_cred):
+        """Test that Graph pages are followed verbatim without re-sending params."""
+        mock_cred.return_value = MagicMock()
+        provider = EntraGraphProvider(auth=AzureAuth())
+        next_link = "https://graph.microsoft.com/beta/next?$skiptoken=2"
+        pages = [
+            {"value": [{"id": "1"}], "@odata.nextLink": next_link},
+            {"value": [{"id": "2"}]},
+        ]
+
+        with patch.object(provider, "_make_request", side_effect=pages) as mock_request:
+            results = provider.list_active_assignments(principal_id="user-123")
+
+        assert [r["id"] for r in results] == ["1", "2"]
+        assert mock_request.call_args.args[1:3] == (next_link, None)
+
+    @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+    def test_iter_eligible_roles_stops_early(self, mock_cred):
+        """Test that taking the first item only fetches what has been prefetched."""
+        mock_cred.return_value = MagicMock()
+        provider = EntraGraphProvider(auth=AzureAuth())
+        page = {"value": [{"id": "1"}], "@odata.nextLink": "https://graph.microsoft.com/beta/n"}
+
+        with patch.object(provider, "_make_request", return_value=page) as mock_request:
+            roles = provider.iter_eligible_roles(principal_id="user-123")
+            assert next(roles) == {"id": "1"}
+            roles.close()
+
+        assert mock_request.call_count <= 2
+
+    @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+    def test_list_active_assignments_skips_prefetch_at_limit(self, mock_cred):
+        """Test that no next page is prefetched once the limit is reached."""
+        mock_cred.return_value = MagicMock()
+        provider = EntraGraphProvider(auth=AzureAuth())
+        page = {
+            "value": [{"id": "1"}, {"id": "2"}],
+            "@odata.nextLink": "https://graph.microsoft.com/beta/next",
+        }
+
+        with patch.object(provider, "_make_request", return_value=page) as mock_request:
+            results = provider.list_active_assignments(principal_id="user-123", limit=2)
+
+        assert len(results) == 2
+        mock_request.assert_called_once()
 
 
 class TestAzureARMProvider:
@@ -77,6 +213,23 @@ class TestAzureARMProvider:
         provider = AzureARMProvider(auth=auth, verbose=True)
         assert provider.verbose is True
 
+    @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+    def test_make_request_permission_error_message(self, mock_cred):
+        """Test that the ARM error message is surfaced on 403, even with an empty body."""
+        mock_cred.return_value = MagicMock()
+        provider = AzureARMProvider(auth=AzureAuth())
+        denied = MagicMock(status_code=403, content=b'{"error": {"message": "Denied"}}')
+        empty = MagicMock(status_code=403, content=b"")
+
+        with (
+            patch.object(provider, "_get_headers", return_value={}),
+            patch.object(provider._session, "request", side_effect=[denied, empty]),
+        ):
+            with pytest.raises(PermissionError, match="Denied"):
+                provider._make_request("GET", f"{provider.ARM_API_BASE}/x")
+            with pytest.raises(PermissionError, match="Insufficient permissions"):
+                provider._make_request("GET", f"{provider.ARM_API_BASE}/x")
+
     @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
     def test_get_headers(self, mock_cred):
         """Test getting request headers."""
@@ -93,3 +246,108 @@ class TestAzureARMProvider:
         assert "Authorization" in headers
         assert headers["Authorization"] == "Bearer test-arm-token"
         assert "Content-Type" in headers
+        assert headers["Accept"] == "application/json"
+        assert "gzip" in headers["Accept-Encoding"]
+
+    @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+    def test_list_eligible_roles_follows_next_link_until_limit(self, mock_cred):
+        """Test that pagination stops once the limit is satisfied."""
+        mock_cred.return_value = MagicMock()
+        provider = AzureARMProvider(auth=AzureAuth())
+        pages = [
+            {
+                "value": [{"id": "1"}, {"id": "2"}],
+                "nextLink": "https://management.azure.com/next-1",
+            },
+            {
+                "value": [{"id": "3"}, {"id": "4"}],
+                "nextLink": "https://management.azure.com/next-2",
+            },
+        ]
+
+        with patch.object(provider, "_make_request", side_effect=pages) as mock_request:
+            results = provider.list_eligible_roles("subscriptions/a", limit=3)
+
+        assert [r["id"] for r in results] == ["1", "2", "3"]
+        assert mock_request.call_count == 2
+        assert mock_request.call_args.args[1:3] == ("https://management.azure.com/next-1", None)
+
+    @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+    def test_list_eligible_roles_for_scopes(self, mock_cred):
+        """Test listing eligible roles across several scopes in one batch call."""
+        mock_cred.return_value = MagicMock()
+        provider = AzureARMProvider(auth=AzureAuth())
+        batch_response = {
+            "responses": [
+                {"name": "1", "httpStatusCode": 200, "content": {"value": [{"id": "b"}]}},
+                {"name": "0", "httpStatusCode": 200, "content": {"value": [{"id": "a"}]}},
+            ]
+        }
+
+        with patch.object(provider, "_make_request", return_value=batch_response) as mock_request:
+            results = provider.list_eligible_roles_for_scopes(
+                ["subscriptions/a", "subscriptions/b", "subscriptions/a"]
+            )
+
+        mock_request.assert_called_once()
+        method, url = mock_request.call_args.args[:2]
+        batch_requests = mock_request.call_args.kwargs["json_data"]["requests"]
+        assert (method, url) == ("POST", "https://management.azure.com/batch")
+        assert len(batch_requests) == 2
+        assert batch_requests[0]["url"].startswith(
+            "/subscriptions/a/providers/Microsoft.Authorization/roleEligibilityScheduleInstances?"
+        )
+        assert list(results) == ["subscriptions/a", "subscriptions/b"]
+        assert results["subscriptions/a"] == [{"id": "a"}]
+        assert results["subscriptions/b"] == [{"id": "b"}]
+
+    @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+    def test_batch_list_falls_back_per_scope(self, mock_cred):
+        """Test that failed batch sub-responses are listed per scope."""
+        mock_cred.return_value = MagicMock()
+        provider = AzureARMProvider(auth=AzureAuth())
+        batch_response = {
+            "responses": [
+                {"name": "0", "httpStatusCode": 200, "content": {"value": [{"id": "a"}]}},
+                {"name": "1", "httpStatusCode": 403, "content": {"error": {}}},
+            ]
+        }
+
+        with (
+            patch.object(provider, "_make_request", return_value=batch_response),
+            patch.object(
+                provider,
+                "list_eligible_roles",
+                side_effect=lambda scope, principal_id=None, limit=None: [{"scope": scope}],
+            ) as mock_list,
+        ):
+            results = provider.batch_list(["subscriptions/a", "subscriptions/b"])
+
+        mock_list.assert_called_once_with("subscriptions/b", None, None)
+        assert results["subscriptions/a"] == [{"id": "a"}]
+        assert results["subscriptions/b"] == [{"scope": "subscriptions/b"}]
+
+    @patch("az_pim_cli.auth.azurecli.AzureCliCredential")
+    def test_batch_list_falls_back_when_batch_denied(self, mock_cred):
+        """Test that a 403 on the /batch call itself lists every scope separately."""
+        mock_cred.return_value = MagicMock()
+        provider = AzureARMProvider(auth=AzureAuth())
+        denied = MagicMock(status_code=403, content=b'{"error": {"message": "Denied"}}')
+
+        with (
+            patch.object(provider, "_get_headers", return_value={}),
+            patch.object(provider._session, "request", return_value=denied) as mock_request,
+            patch.object(
+                provider,
+                "list_eligible_roles",
+                side_effect=lambda scope, principal_id=None, limit=None: [{"scope": scope}],
+            ) as mock_list,
+        ):
+            results = provider.batch_list(["subscriptions/a", "subscriptions/b"])
+
+        assert mock_request.call_args.args[:2] == ("POST", provider.BATCH_URL)
+        assert mock_list.call_count == 2
+        assert results == {
+            "subscriptions/a": [{"scope": "subscriptions/a"}],
+            "subscriptions/b": [{"scope": "subscriptions/b"}],
+        }
@@ -6,9 +6,12 @@ from unittest.mock import patch
 import pytest
 
 from az_pim_cli.resolver import (
+    CandidateIndex,
     InputResolver,
     Match,
     MatchStrategy,
+    _pattern_masks,
+    _similarity,
     resolve_role,
     resolve_scope,
 )
@@ -82,6 +85,16 @@ class TestExactMatching:
         )
         assert result == sample_candidates[0]
 
+    def test_exact_match_duplicate_names(self, resolver_non_tty):
+        """Test that candidates sharing a name are all returned as exact matches."""
+        candidates = [{"id": "1", "name": "Reader"}, {"id": "2", "name": "Reader"}]
+        matches = resolver_non_tty._find_matches(
+            "Reader", CandidateIndex.build(candidates, lambda x: x["name"])
+        )
+
+        assert [m.item["id"] for m in matches] == ["1", "2"]
+        assert all(m.strategy == MatchStrategy.EXACT for m in matches)
+
 
 class TestCaseInsensitiveMatching:
     """Test case-insensitive matching strategy."""
@@ -143,6 +156,48 @@ class TestPrefixMatching:
         # Should return None and show error in non-TTY
         assert result is None
 
+    def test_index_names_are_interned(self):
+        """Test that equal names from separate candidate lists share one object."""
+        first = CandidateIndex.build(["".join(["Own", "er"])], lambda x: x)
+        second = CandidateIndex.build(["".join(["Own", "er"])], lambda x: x)
+
+        assert first.names[0] is second.names[0]
+        assert first.lower_names[0] is second.lower_names[0]
+
+    def test_index_accepts_non_str_names(self):
+        """Test that missing names and str subclasses are indexed instead of raising."""
+
+        class RoleName(str):
+            pass
+
+        index = CandidateIndex.build(
+            [{"name": None}, {"name": RoleName("Owner")}], lambda x: x["name"]
+        )
+
+        assert index.names == ["", "Owner"]
+        assert type(index.names[1]) is str
+
+    def test_missing_name_never_matches(self, resolver_non_tty):
+        """Test that a candidate without a name is not matched or suggested as "None"."""
+        candidates = [{"id": "1", "name": None}, {"id": "2", "name": "Owner"}]
+
+        with resolver_non_tty.console.capture() as capture:
+            result = resolver_non_tty.resolve("None", candidates, lambda x: x["name"], "role")
+
+        output = capture.get()
+        assert result is None
+        assert "1. Owner" in output
+        assert "2." not in output
+
+    def test_prefix_positions_keep_candidate_order(self):
+        """Test that the sorted prefix index returns matches in candidate order."""
+        names = ["Security Reader", "Owner", "security admin", "Sec", "Reader"]
+        index = CandidateIndex.build(names, lambda x: x)
+
+        assert index.prefix_positions("sec") == [0, 2, 3]
+        assert index.prefix_positions("security r") == [0]
+        assert index.prefix_positions("z") == []
+
 
 class TestFuzzyMatching:
     """Test fuzzy matching strategy."""
@@ -168,6 +223,44 @@ class TestFuzzyMatching:
         )
         assert result is None
 
+    def test_fuzzy_match_respects_limit(self):
+        """Test that only the best fuzzy matches up to the limit are returned."""
+        resolver = InputResolver(fuzzy_threshold=0.5, is_tty=False)
+        names = ["Readerss", "Reader", "Readers"]
+        matches = resolver._fuzzy_match("Reade", [(n, n) for n in names], limit=2)
+
+        assert [m.name for m in matches] == ["Reader", "Readers"]
+
+    def test_single_suggestion(self, resolver_non_tty, sample_candidates):
+        """Test asking for a single suggestion returns the best candidate only."""
+        names = [c["name"] for c in sample_candidates]
+        assert resolver_non_tty._get_suggestions("Ownr", names, max_suggestions=1) == ["Owner"]
+        assert resolver_non_tty._get_suggestions("zzzzzzzz", names, max_suggestions=1) == []
+
+    def test_no_match_error_printed_once(self, resolver_non_tty, sample_candidates):
+        """Test that the no-match message and suggestions are written in one print."""
+        with patch.object(resolver_non_tty.console, "print") as mock_print:
+            resolver_non_tty._show_no_match_error(
+                "Ownr", CandidateIndex.build(sample_candidates, lambda x: x["name"]), "role"
+            )
+
+        mock_print.assert_called_once()
+        with resolver_non_tty.console.capture() as capture:
+            resolver_non_tty.console.print(*mock_print.call_args.args)
+        assert "Role 'Ownr' not found" in capture.get()
+        assert "1. Owner" in capture.get()
+
+    def test_repeated_no_match_reuses_suggestions(self, resolver_non_tty, sample_candidates):
+        """Test that suggestions for a repeated typo are computed once per index."""
+        index = CandidateIndex.build(sample_candidates, lambda x: x["name"])
+        with patch.object(
+            resolver_non_tty, "_get_suggestions", return_value=["Owner"]
+        ) as mock_suggestions:
+            resolver_non_tty._show_no_match_error("Ownr", index, "role")
+            resolver_non_tty._show_no_match_error("Ownr", index, "role")
+
+        mock_suggestions.assert_called_once()
+
     def test_fuzzy_disabled(self, sample_candidates):
         """Test that fuzzy matching can be disabled."""
         resolver = InputResolver(fuzzy_enabled=False, is_tty=False)
@@ -179,6 +272,69 @@ class TestFuzzyMatching:
         )
         assert result is None
 
+    def test_no_match_extracts_names_once(self, resolver_non_tty, sample_candidates):
+        """Test that suggestions reuse the names extracted for matching."""
+        calls = []
+
+        def extract(candidate):
+            calls.append(candidate)
+            return candidate["name"]
+
+        result = resolver_non_tty.resolve(
+            user_input="XYZ",
+            candidates=sample_candidates,
+            name_extractor=extract,
+            context="role",
+        )
+        assert result is None
+        assert len(calls) == len(sample_candidates)
+
+
+class TestFallbackScorer:
+    """Test the built-in scorer used when rapidfuzz is not installed."""
+
+    @pytest.mark.parametrize(
+        ("a", "b", "expected"),
+        [
+            ("Owner", "Owner", 1.0),
+            ("Ownar", "Owner", 0.8),
+            ("abc", "xyz", 0.0),
+            ("", "", 1.0),
+        ],
+    )
+    def test_similarity(self, a, b, expected):
+        """Test that similarity is 2 * LCS / total length."""
+        assert _similarity(a, _pattern_masks(a), b) == pytest.approx(expected)
+
+    def test_fuzzy_match_without_rapidfuzz(self, resolver_non_tty, sample_candidates):
+        """Test fuzzy matching and suggestions with the built-in scorer."""
+        with patch("az_pim_cli.resolver.HAS_RAPIDFUZZ", False):
+            result = resolver_non_tty.resolve(
+                user_input="Ownar",
+                candidates=sample_candidates,
+                name_extractor=lambda x: x["name"],
+                context="role",
+            )
+            suggestions = resolver_non_tty._get_suggestions(
+                "Reeder", [c["name"] for c in sample_candidates]
+            )
+
+        assert result == sample_candidates[0]
+        assert suggestions[0] == "Reader"
+        assert len(suggestions) <= 3
+
+    def test_fuzzy_match_skips_names_of_incompatible_length(self, resolver_non_tty):
+        """Test that names too long or short to reach the threshold are not scored."""
+        candidates = ["Ownar", "O", "Owner of every subscription in the tenant"]
+        with (
+            patch("az_pim_cli.resolver.HAS_RAPIDFUZZ", False),
+            patch("az_pim_cli.resolver._similarity", wraps=_similarity) as mock_similarity,
+        ):
+            matches = resolver_non_tty._fuzzy_match("Owner", [(c, c) for c in candidates])
+
+        assert [m.name for m in matches] == ["Ownar"]
+        mock_similarity.assert_called_once()
+
 
 class TestInteractiveMode:
     """Test interactive selection in TTY mode."""
@@ -199,6 +355,41 @@ class TestInteractiveMode:
         assert result in [sample_candidates[3], sample_candidates[4]]
         mock_prompt.assert_called_once()
 
+    @patch("az_pim_cli.resolver.Prompt.ask")
+    def test_interactive_reprompts_on_invalid_number(self, mock_prompt, resolver_tty):
+        """Test that out-of-range or non-numeric choices prompt again."""
+        mock_prompt.side_effect = ["0", "abc", "3", "2"]
+        matches = [Match(item, item, MatchStrategy.PREFIX, 0.9) for item in ("a", "b")]
+
+        assert resolver_tty._interactive_select(matches, "role") == "b"
+        assert mock_prompt.call_count == 4
+
+    @patch("az_pim_cli.resolver.Prompt.ask")
+    def test_interactive_reprompts_on_non_ascii_digit(self, mock_prompt, resolver_tty):
+        """Test that digits int() cannot parse (e.g. superscripts) prompt again."""
+        mock_prompt.side_effect = ["²", "1"]
+        matches = [Match(item, item, MatchStrategy.PREFIX, 0.9) for item in ("a", "b")]
+
+        assert resolver_tty._interactive_select(matches, "role") == "a"
+        assert mock_prompt.call_count == 2
+
+    @patch("az_pim_cli.resolver.Prompt.ask")
+    def test_interactive_list_shows_names_verbatim(self, mock_prompt, resolver_tty):
+        """Test that the choice list prints names containing brackets as-is."""
+        mock_prompt.return_value = "2"
+        matches = [
+            Match("a", "Reader [prod]", MatchStrategy.PREFIX, 0.9),
+            Match("b", "Reader [dev]", MatchStrategy.PREFIX, 0.9),
+        ]
+
+        with resolver_tty.console.capture() as capture:
+            result = resolver_tty._interactive_select(matches, "role")
+
+        assert result == "b"
+        output = capture.get()
+        assert "1. Reader [prod]" in output
+        assert "2. Reader [dev]" in output
+
     @patch("az_pim_cli.resolver.Prompt.ask")
     def test_interactive_user_selects_second(self, mock_prompt, resolver_tty, sample_candidates):
         """Test interactive selection when user picks second option."""
@@ -255,6 +446,20 @@ class TestCaching:
         # Should be expired
         assert resolver.get_cached("test_key") is None
 
+    def test_cache_evicts_least_recently_used(self):
+        """Test that the cache is bounded and evicts the least recently used key."""
+        resolver = InputResolver(is_tty=False)
+        resolver.CACHE_MAX_ENTRIES = 2
+
+        resolver.set_cache("key1", "value1")
+        resolver.set_cache("key2", "value2")
+        assert resolver.get_cached("key1") == "value1"
+        resolver.set_cache("key3", "value3")
+
+        assert resolver.get_cached("key2") is None
+        assert resolver.get_cached("key1") == "value1"
+        assert resolver.get_cached("key3") == "value3"
+
     def test_cache_clear(self, resolver_non_tty):
         """Test cache clear."""
         resolver_non_tty.set_cache("key1", "value1")
@@ -387,6 +592,26 @@ class TestResolveRole:
         # Fetch function should only be called once due to caching
         assert len(fetch_calls) == 1
 
+    def test_resolve_role_reuses_extracted_names(self, resolver_non_tty):
+        """Test that cached role lists are not re-scanned by the name extractor."""
+        roles = [{"name": "Owner"}, {"name": "Contributor"}]
+        calls = []
+
+        def extract(role):
+            calls.append(role)
+            return role["name"]
+
+        for role_input in ("owner", "Contrib"):
+            resolve_role(
+                resolver=resolver_non_tty,
+                role_input=role_input,
+                scope="/subscriptions/123",
+                fetch_roles_fn=lambda: roles,
+                role_name_extractor=extract,
+            )
+
+        assert len(calls) == len(roles)
+
 
 class TestResolveScopeHelper:
     """Test resolve_scope helper function."""
@@ -493,6 +718,11 @@ class TestMatchStrategy:
         assert match.strategy == MatchStrategy.EXACT
         assert match.score == 1.0
 
+    def test_match_has_no_instance_dict(self):
+        """Test that Match uses slots, since one is created per matched candidate."""
+        match = Match(item="x", name="x", strategy=MatchStrategy.EXACT)
+        assert not hasattr(match, "__dict__")
+
     def test_match_strategies_enum(self):
         """Test MatchStrategy enum values."""
         assert MatchStrategy.EXACT.value == "exact"
@@ -0,0 +1,130 @@
+"""Tests for retry with exponential backoff."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from az_pim_cli.retry import backoff_delay, retry_after_seconds, send_with_retry
+
+
+def make_response(status_code: int, headers: dict[str, str] | None = None) -> MagicMock:
+    """Build a minimal response stub."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+class TestBackoffDelay:
+    """Tests for backoff_delay."""
+
+    def test_grows_exponentially(self):
+        """Delay doubles per attempt when jitter is disabled."""
+        assert [backoff_delay(i, base=1.0, jitter=0) for i in range(4)] == [1.0, 2.0, 4.0, 8.0]
+
+    def test_capped(self):
+        """Delay never exceeds the cap before jitter."""
+        assert backoff_delay(10, base=1.0, cap=30.0, jitter=0) == 30.0
+
+    def test_jitter_bounds(self):
+        """Jitter adds at most the configured fraction."""
+        for _ in range(20):
+            assert 2.0 <= backoff_delay(1, base=1.0, jitter=0.5) <= 3.0
+
+
+class TestRetryAfter:
+    """Tests for Retry-After parsing."""
+
+    def test_seconds(self):
+        """Numeric Retry-After is returned as seconds."""
+        assert retry_after_seconds(make_response(429, {"Retry-After": "7"})) == 7.0
+
+    def test_missing(self):
+        """Missing header yields None."""
+        assert retry_after_seconds(make_response(429)) is None
+
+    def test_invalid(self):
+        """Unparseable header yields None."""
+        assert retry_after_seconds(make_response(429, {"Retry-After": "soon"})) is None
+
+
+@patch("az_pim_cli.retry.time.sleep")
+class TestSendWithRetry:
+    """Tests for send_with_retry."""
+
+    def test_success_not_retried(self, mock_sleep):
+        """A successful response is returned without sleeping."""
+        send = MagicMock(return_value=make_response(200))
+
+        assert send_with_retry(send).status_code == 200
+        send.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    def test_throttled_then_success(self, mock_sleep):
+        """429 is retried, honoring Retry-After."""
+        send = MagicMock(side_effect=[make_response(429, {"Retry-After": "2"}), make_response(200)])
+
+        assert send_with_retry(send).status_code == 200
+        assert send.call_count == 2
+        mock_sleep.assert_called_once_with(2.0)
+
+    def test_gives_up_after_max_retries(self, mock_sleep):
+        """The last retryable response is returned once retries run out."""
+        send = MagicMock(return_value=make_response(503))
+
+        assert send_with_retry(send, max_retries=2).status_code == 503
+        assert send.call_count == 3
+        assert mock_sleep.call_count == 2
+
+    @pytest.mark.parametrize("status_code", [400, 401, 403, 404])
+    def test_client_errors_not_retried(self, mock_sleep, status_code):
+        """Non-transient errors are returned immediately."""
+        send = MagicMock(return_value=make_response(status_code))
+
+        assert send_with_retry(send).status_code == status_code
+        send.assert_called_once()
+
+    def test_transport_error_retried(self, mock_sleep):
+        """Connection errors are retried for idempotent requests."""
+        send = MagicMock(side_effect=[requests.exceptions.ConnectionError(), make_response(200)])
+
+        assert send_with_retry(send).status_code == 200
+        assert send.call_count == 2
+
+    def test_transport_error_not_retried_when_disabled(self, mock_sleep):
+        """Timeouts propagate immediately for non-idempotent requests."""
+        send = MagicMock(side_effect=requests.exceptions.Timeout())
+
+        with pytest.raises(requests.exceptions.Timeout):
+            send_with_retry(send, idempotent=False)
+        send.assert_called_once()
+
+    @pytest.mark.parametrize("status_code", [502, 504])
+    def test_gateway_error_not_retried_when_not_idempotent(self, mock_sleep, status_code):
+        """A gateway error on a non-idempotent request is not resent."""
+        send = MagicMock(return_value=make_response(status_code))
+
+        assert send_with_retry(send, idempotent=False).status_code == status_code
+        send.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    def test_throttling_retried_when_not_idempotent(self, mock_sleep):
+        """429, and 503 with Retry-After, are retried even for non-idempotent requests."""
+        send = MagicMock(
+            side_effect=[
+                make_response(429),
+                make_response(503, {"Retry-After": "1"}),
+                make_response(201),
+            ]
+        )
+
+        assert send_with_retry(send, idempotent=False).status_code == 201
+        assert send.call_count == 3
+
+    def test_unavailable_without_retry_after_not_retried_when_not_idempotent(self, mock_sleep):
+        """A bare 503 on a non-idempotent request is returned as-is."""
+        send = MagicMock(return_value=make_response(503))
+
+        assert send_with_retry(send, idempotent=False).status_code == 503
+        send.assert_called_once()
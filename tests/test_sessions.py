@@ -0,0 +1,37 @@
+"""Tests for per-thread HTTP sessions."""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from az_pim_cli.sessions import ThreadLocalSession
+
+
+def test_session_is_per_thread():
+    """A thread keeps its own session; other threads get a different one."""
+    sessions = ThreadLocalSession(headers={"Accept": "application/json"})
+    main = sessions.get()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        worker = executor.submit(sessions.get).result()
+
+    assert sessions.get() is main
+    assert worker is not main
+    assert worker.headers["Accept"] == "application/json"
+
+
+def test_close_closes_every_thread_session():
+    """close() closes the sessions of all threads and later calls start fresh."""
+    sessions = ThreadLocalSession()
+    main = sessions.get()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        worker = executor.submit(sessions.get).result()
+
+    with (
+        patch.object(main, "close") as close_main,
+        patch.object(worker, "close") as close_worker,
+    ):
+        sessions.close()
+
+    close_main.assert_called_once()
+    close_worker.assert_called_once()
+    assert sessions.get() is not main
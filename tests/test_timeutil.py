@@ -0,0 +1,17 @@
+"""Tests for timestamp helpers."""
+
+import re
+from datetime import datetime, timedelta, timezone
+
+from az_pim_cli.timeutil import utcnow_iso_z
+
+
+def test_utcnow_iso_z_format():
+    """Start times are second-precision UTC timestamps with a Z suffix."""
+    assert re.fullmatch(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z", utcnow_iso_z())
+
+
+def test_utcnow_iso_z_is_current_utc():
+    """The timestamp is taken in UTC, not local time."""
+    parsed = datetime.strptime(utcnow_iso_z(), "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    assert abs(datetime.now(timezone.utc) - parsed) < timedelta(seconds=5)